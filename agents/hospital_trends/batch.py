@@ -0,0 +1,207 @@
+import os
+import json
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+from dotenv import load_dotenv
+
+from agents.hospital_trends.integrated import generate_integrated_report
+from agents.hospital_trends.snowflake_queries import US_STATES
+
+# Load environment variables
+load_dotenv()
+
+# Batch settings (overridable through the environment)
+BATCH_OUTPUT_DIRECTORY = os.getenv("BATCH_OUTPUT_DIRECTORY", "batch_reports")
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "3"))
+# Minimum seconds between two reports starting, to spread the burst of LLM and search calls
+BATCH_START_INTERVAL = float(os.getenv("BATCH_START_INTERVAL", "5"))
+
+MANIFEST_NAME = "manifest.json"
+
+PENDING = "pending"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+def resolve_states(states: Union[str, Iterable[str]]) -> List[str]:
+    """
+    Validates a state selection.
+
+    Args:
+        states: "all" for all 50 states, a comma-separated string, or a list of state names.
+
+    Returns:
+        State names in request order, without duplicates.
+    """
+    if isinstance(states, str):
+        if states.strip().lower() == "all":
+            return list(US_STATES)
+        states = states.split(",")
+    names = list(dict.fromkeys(state.strip() for state in states if state.strip()))
+    unknown = [state for state in names if state not in US_STATES]
+    if unknown:
+        raise ValueError(f"Unknown state(s): {', '.join(unknown)}")
+    if not names:
+        raise ValueError("No states selected")
+    return names
+
+
+def report_filename(state: str) -> str:
+    return f"{state}_integrated_healthcare_report.md"
+
+
+def read_manifest(output_directory: str = BATCH_OUTPUT_DIRECTORY) -> Optional[Dict[str, Any]]:
+    """The run manifest in `output_directory`, or None if no batch has run there."""
+    try:
+        with open(os.path.join(output_directory, MANIFEST_NAME)) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+class BatchRun:
+    """
+    Generates reports for many states on a bounded thread pool.
+
+    Reports run in this process, so they share the report, Tavily and reference
+    caches and the Snowflake connection pool. Starts are spaced `start_interval`
+    seconds apart. Progress is recorded in `<output_directory>/manifest.json`
+    after every state change, and a resumed run skips states that already
+    succeeded, so an interrupted batch continues where it stopped.
+    """
+
+    def __init__(self, states: Union[str, Iterable[str]], output_directory: str = BATCH_OUTPUT_DIRECTORY,
+                 concurrency: int = BATCH_CONCURRENCY, refresh: bool = False,
+                 start_interval: float = BATCH_START_INTERVAL, resume: bool = True):
+        self.states = resolve_states(states)
+        self.output_directory = output_directory
+        self.concurrency = max(1, concurrency)
+        self.refresh = refresh
+        self.start_interval = start_interval
+        self.resume = resume
+        self._lock = threading.Lock()
+        self._last_start = 0.0
+        self.manifest = self._initial_manifest()
+
+    # ---- MANIFEST ----
+
+    def _initial_manifest(self) -> Dict[str, Any]:
+        previous = (read_manifest(self.output_directory) if self.resume else None) or {}
+        previous_states = previous.get("states", {})
+        states = {}
+        for state in self.states:
+            entry = previous_states.get(state)
+            done = entry and entry.get("status") == SUCCEEDED and os.path.exists(
+                os.path.join(self.output_directory, entry.get("path", ""))
+            )
+            states[state] = entry if done else {"status": PENDING}
+        return {
+            "started_at": time.time(),
+            "finished_at": None,
+            "concurrency": self.concurrency,
+            "refresh": self.refresh,
+            "states": states,
+        }
+
+    def _save_manifest(self):
+        """Writes the manifest atomically. Caller holds the lock."""
+        os.makedirs(self.output_directory, exist_ok=True)
+        path = os.path.join(self.output_directory, MANIFEST_NAME)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as file:
+            json.dump(self.manifest, file, indent=2)
+        os.replace(tmp_path, path)
+
+    def _update(self, state: str, **fields):
+        with self._lock:
+            self.manifest["states"][state].update(fields)
+            self._save_manifest()
+
+    # ---- RUN ----
+
+    def _wait_for_start_slot(self):
+        # Reserve the next slot under the lock, then sleep outside it
+        with self._lock:
+            slot = max(time.monotonic(), self._last_start + self.start_interval)
+            self._last_start = slot
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def _run_state(self, state: str):
+        self._wait_for_start_slot()
+        started = time.time()
+        self._update(state, status=RUNNING, started_at=started, error=None)
+        print(f"📄 Batch: generating report for {state}")
+        timings = {}
+        try:
+            report = generate_integrated_report(state, timings=timings, refresh=self.refresh)
+            filename = report_filename(state)
+            with open(os.path.join(self.output_directory, filename), "w") as file:
+                file.write(str(report))
+        except Exception as e:
+            print(f"Batch: report for {state} failed: {str(e)}")
+            self._update(state, status=FAILED, finished_at=time.time(), seconds=round(time.time() - started, 3),
+                         timings=timings, error=str(e))
+            return
+        self._update(state, status=SUCCEEDED, finished_at=time.time(), seconds=round(time.time() - started, 3),
+                     timings=timings, cached=timings.get("cache") == "hit", path=filename)
+
+    def pending_states(self) -> List[str]:
+        return [state for state, entry in self.manifest["states"].items() if entry["status"] != SUCCEEDED]
+
+    def run(self) -> Dict[str, Any]:
+        """Runs every state that hasn't succeeded yet and returns the final manifest."""
+        pending = self.pending_states()
+        skipped = len(self.states) - len(pending)
+        print(f"Batch: {len(pending)} report(s) to generate, {skipped} already done, concurrency {self.concurrency}")
+        with self._lock:
+            self._save_manifest()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="batch-report") as pool:
+            list(pool.map(self._run_state, pending))
+
+        with self._lock:
+            self.manifest["finished_at"] = time.time()
+            self._save_manifest()
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {PENDING: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for entry in self.manifest["states"].values():
+                counts[entry["status"]] += 1
+            return {"output_directory": self.output_directory, **counts, "manifest": self.manifest}
+
+
+def run_batch(states: Union[str, Iterable[str]] = "all", **options) -> Dict[str, Any]:
+    """Runs a batch of state reports; see BatchRun for the options."""
+    return BatchRun(states, **options).run()
+
+
+if __name__ == "__main__":
+    # python -m agents.hospital_trends.batch --states all --concurrency 3
+    parser = argparse.ArgumentParser(description="Generate integrated healthcare reports for many states.")
+    parser.add_argument("--states", default="all", help='"all" or a comma-separated list of state names')
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY)
+    parser.add_argument("--output-dir", default=BATCH_OUTPUT_DIRECTORY)
+    parser.add_argument("--start-interval", type=float, default=BATCH_START_INTERVAL)
+    parser.add_argument("--refresh", action="store_true", help="Ignore cached reports")
+    parser.add_argument("--no-resume", action="store_true", help="Regenerate states that already succeeded")
+    args = parser.parse_args()
+
+    result = run_batch(
+        args.states,
+        output_directory=args.output_dir,
+        concurrency=args.concurrency,
+        refresh=args.refresh,
+        start_interval=args.start_interval,
+        resume=not args.no_resume,
+    )
+    print(f"Batch finished: {result[SUCCEEDED]} succeeded, {result[FAILED]} failed "
+          f"(manifest: {os.path.join(args.output_dir, MANIFEST_NAME)})")
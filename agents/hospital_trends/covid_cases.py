@@ -0,0 +1,92 @@
+import os
+import time
+import threading
+from typing import Dict, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from agents.hospital_trends.reference_store import reference_store
+from agents.hospital_trends.snowflake_pool import lease_connection
+from agents.hospital_trends.snowflake_queries import covid_cases_by_year_query
+from agents.hospital_trends.snowflake_results import fetch_dataframe
+from agents.hospital_trends.tool_output import encode_table
+
+# Load environment variables
+load_dotenv()
+
+# How long the in-memory table is served before it is refreshed
+COVID_TABLE_TTL_SECONDS = float(os.getenv("COVID_TABLE_TTL_SECONDS", str(24 * 3600)))
+
+
+class CovidYearlyTable:
+    """
+    Year-over-year COVID cases and deaths for every state, held in memory.
+
+    The aggregate for all states is built with a single query per refresh (from
+    the local reference snapshot when available, otherwise one Snowflake query
+    with no WHERE clause) and pre-rendered per state, so each tool call is a
+    dictionary lookup. The all-states table has one row per state and a
+    column per year.
+    """
+
+    def __init__(self, ttl_seconds: float = COVID_TABLE_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._by_state: Dict[str, str] = {}
+        self._all_states = ""
+        self._loaded_at: Optional[float] = None
+        self._stats = {"refreshes": 0, "snowflake_queries": 0, "lookups": 0}
+
+    def _fetch(self) -> pd.DataFrame:
+        local = reference_store.query_dataframe(
+            "covid_cases_by_year", "SELECT YEAR, STATE, CASES, DEATHS FROM covid_cases_by_year ORDER BY STATE, YEAR"
+        )
+        if local is not None:
+            return local
+
+        with lease_connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(covid_cases_by_year_query(None))
+                self._stats["snowflake_queries"] += 1
+                return fetch_dataframe(cursor)
+            finally:
+                cursor.close()
+
+    def refresh(self):
+        """Rebuilds the table from one all-states query."""
+        data = self._fetch()
+        by_state = {
+            str(state): encode_table(rows)
+            for state, rows in data.groupby("STATE", sort=True)
+        }
+        wide = data.pivot(index="STATE", columns="YEAR", values=["CASES", "DEATHS"])
+        wide.columns = [f"{value}_{year}" for value, year in wide.columns]
+        self._by_state = by_state
+        self._all_states = encode_table(wide.reset_index(), max_rows=0)
+        self._loaded_at = time.monotonic()
+        self._stats["refreshes"] += 1
+
+    def _ensure_fresh(self):
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds:
+            return
+        # Single flight: concurrent callers wait for one refresh instead of each querying
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                self.refresh()
+
+    def render(self, state: Optional[str] = None) -> Optional[str]:
+        """CSV table for one state (None if unknown), or for all states when `state` is None."""
+        self._ensure_fresh()
+        self._stats["lookups"] += 1
+        if not state:
+            return self._all_states
+        return self._by_state.get(state)
+
+    def stats(self):
+        return {"states": len(self._by_state), **self._stats}
+
+
+# Process-wide table
+covid_yearly_table = CovidYearlyTable()
@@ -0,0 +1,95 @@
+import os
+import threading
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from agents.hospital_trends.tool_output import encode_table
+
+# Community hospital beds per 1,000 residents, by state (AHA Annual Survey of Hospitals)
+HOSPITAL_BEDS_CSV = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "data", "DQS_Community_hospital_beds__by_state__United_States.csv"
+)
+NATIONAL_SUBGROUP = "United States"
+
+
+def load_hospital_beds(file_path: str = HOSPITAL_BEDS_CSV) -> pd.DataFrame:
+    """Reads only the columns the trend analysis needs, with their final dtypes."""
+    data = pd.read_csv(
+        file_path,
+        usecols=["SUBGROUP", "TIME_PERIOD", "ESTIMATE"],
+        dtype={"SUBGROUP": "category"},
+        encoding="utf-8-sig",
+    )
+    data["ESTIMATE"] = pd.to_numeric(data["ESTIMATE"], errors="coerce").astype("float64")
+    data["TIME_PERIOD"] = pd.to_numeric(data["TIME_PERIOD"], errors="coerce")
+    return data
+
+
+def compute_bed_trends(data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Per-state trend metrics, computed with vectorized group operations.
+
+    Columns match the original analysis: Average_Annual_Change, Total_Change,
+    Start_Year, End_Year, Start_Value and End_Value, indexed by SUBGROUP.
+    """
+    groups = data.groupby("SUBGROUP", observed=True, sort=True)
+    percent_change = groups["ESTIMATE"].pct_change() * 100
+
+    start_value = groups["ESTIMATE"].first()
+    end_value = groups["ESTIMATE"].last()
+    observations = groups["ESTIMATE"].size()
+
+    trends = pd.DataFrame({
+        "Average_Annual_Change": percent_change.groupby(data["SUBGROUP"], observed=True).mean(),
+        "Total_Change": np.where(observations > 1, (end_value - start_value) / start_value * 100, 0.0),
+        "Start_Year": groups["TIME_PERIOD"].min(),
+        "End_Year": groups["TIME_PERIOD"].max(),
+        "Start_Value": start_value,
+        "End_Value": end_value,
+    })
+    trends.index = trends.index.astype(str)
+    trends.index.name = "SUBGROUP"
+    return trends
+
+
+class BedTrendTable:
+    """Hospital-bed trends loaded once, with pre-rendered per-state summaries for O(1) lookups."""
+
+    def __init__(self, file_path: str = HOSPITAL_BEDS_CSV):
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        self._rendered: Dict[str, str] = {}
+        self._rendered_all: Optional[str] = None
+
+    def load(self):
+        """(Re)loads the CSV and pre-renders every lookup."""
+        table = compute_bed_trends(load_hospital_beds(self.file_path)).reset_index()
+        national = table[table["SUBGROUP"] == NATIONAL_SUBGROUP]
+        rendered = {}
+        for position, subgroup in enumerate(table["SUBGROUP"]):
+            rows = table.iloc[[position]]
+            if subgroup != NATIONAL_SUBGROUP:
+                # Each state is shown next to the national benchmark
+                rows = pd.concat([rows, national])
+            rendered[subgroup.lower()] = encode_table(rows)
+
+        with self._lock:
+            self._rendered = rendered
+            self._rendered_all = encode_table(table, max_rows=0)
+
+    def _ensure_loaded(self):
+        if self._rendered_all is None:
+            self.load()
+
+    def render(self, state: Optional[str] = None) -> Optional[str]:
+        """CSV table for one state plus the national row, or for every subgroup when `state` is None."""
+        self._ensure_loaded()
+        if state is None:
+            return self._rendered_all
+        return self._rendered.get(state.strip().lower())
+
+
+# Process-wide table
+bed_trend_table = BedTrendTable()
@@ -1,119 +1,116 @@
 import os
 import json
-import snowflake.connector
+import time
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import requests
-import pandas as pd
-from pypdf import PdfReader
 from typing import Dict, Any, List, Optional
 from dotenv import load_dotenv
-from smolagents import CodeAgent, LiteLLMModel, ToolCallingAgent, tool
+from smolagents import CodeAgent, ToolCallingAgent, tool
+from smolagents.models import ChatMessage, MessageRole
 from tavily import TavilyClient
 
+from agents.hospital_trends.covid_cases import covid_yearly_table
+from agents.hospital_trends.hospital_beds import bed_trend_table
+from agents.hospital_trends.llm_client import get_model
+from agents.hospital_trends.memory_compaction import compact_memory
+from agents.hospital_trends.national_data import national_data
+from agents.hospital_trends.pdf_store import pdf_store
+from agents.hospital_trends.reference_store import reference_store
+from agents.hospital_trends.report_cache import data_fingerprints, report_cache
+from agents.hospital_trends.report_sections import (
+    CLOSING_HEADINGS,
+    COVID_ANALYSIS_HEADINGS,
+    HISTORICAL_CONTEXT_HEADINGS,
+    assemble_report,
+    report_title,
+    section_digest,
+    strip_outer_fence,
+)
+from agents.hospital_trends.snowflake_pool import lease_connection
+from agents.hospital_trends.snowflake_queries import US_STATES, vaccine_providers_query
+from agents.hospital_trends.snowflake_results import fetch_dataframe
+from agents.hospital_trends.tavily_cache import TavilyCache
+from agents.hospital_trends.tool_output import compact_text, encode_search_results, encode_table, truncate_to_tokens
+from agents.hospital_trends.tracing import ReportTrace, TracedTool, instrument_agent, metrics, record_agent, record_stage
+
 # Load environment variables
 load_dotenv()
 
 # Set up Tavily client for web searches
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 tavily_client = TavilyClient(TAVILY_API_KEY)
+# Repeated queries and URLs are answered from disk instead of re-hitting the API
+tavily_cache = TavilyCache(tavily_client)
+
+# Model used by every agent in the report pipeline; all agents share one rate-limited client (see llm_client)
+MODEL_ID = "xai/grok-2-1212"
 
-# Define directories
-DATA_DIRECTORY = ".\\agents\\hospital_trends\\data"
-EMERGING_DATA_DIRECTORY = ".\\agents\\emerging_challenges\\data"
+# Bump whenever the agent prompts change so cached reports are regenerated
+PROMPT_VERSION = "4"
 
 # ---- HELPER FUNCTIONS ----
 
-def get_snowflake_connection():
-    """Creates and returns a Snowflake connection."""
-    return snowflake.connector.connect(
-        user=os.getenv("SNOWFLAKE_USER"),
-        password=os.getenv("SNOWFLAKE_PASSWORD"),
-        account=os.getenv("SNOWFLAKE_ACCOUNT"),
-        database=os.getenv("SNOWFLAKE_DATABASE"),
-        warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
-        schema=os.getenv("SNOWFLAKE_SCHEMA")
-    )
+# Connections are created by agents.hospital_trends.snowflake_pool and shared
+# process-wide; tools borrow one with `lease_connection()` instead of opening their own.
 
-def close_connection(cursor, conn):
-    """Closes a Snowflake cursor and connection."""
+def close_cursor(cursor):
+    """Closes a Snowflake cursor, leaving the pooled connection open."""
     if cursor:
         cursor.close()
-    if conn:
-        conn.close()
 
 # ---- TOOLS FOR HISTORICAL HEALTHCARE DATA ----
 
 @tool
-def analyze_hospital_beds() -> str:
-    """Analyzes hospital bed availability trends from a CSV file."""
-    file_path = os.path.join(DATA_DIRECTORY, "DQS_Community_hospital_beds__by_state__United_States.csv")
+def analyze_hospital_beds(state: Optional[str] = None) -> str:
+    """
+    Analyzes hospital bed availability trends (community hospital beds per 1,000 residents).
     
-    if not os.path.exists(file_path):
-        return f"Error: File '{file_path}' not found."
-
-    data = pd.read_csv(file_path)
-
-    if "ESTIMATE" not in data.columns or "TIME_PERIOD" not in data.columns or "SUBGROUP" not in data.columns:
-        return "Error: Required columns not found in the dataset."
-
-    data["ESTIMATE"] = pd.to_numeric(data["ESTIMATE"], errors="coerce")
-    data["TIME_PERIOD"] = pd.to_numeric(data["TIME_PERIOD"], errors="coerce")
-
-    # Compute trends
-    data["Percent_Change"] = data.groupby("SUBGROUP")["ESTIMATE"].pct_change() * 100
+    Args:
+        state: Optional state name. Returns that state's trend next to the national trend; if None, returns all states.
+    
+    Returns:
+        Table of average annual change, total change and start/end values.
+    """
+    try:
+        summary = bed_trend_table.render(state)
+    except (FileNotFoundError, ValueError) as e:
+        return f"Error: Unable to load hospital beds dataset: {str(e)}"
 
-    summary = data.groupby("SUBGROUP").agg(
-        Average_Annual_Change=("Percent_Change", "mean"),
-        Total_Change=("ESTIMATE", lambda x: ((x.iloc[-1] - x.iloc[0]) / x.iloc[0]) * 100 if len(x) > 1 else 0),
-        Start_Year=("TIME_PERIOD", "min"),
-        End_Year=("TIME_PERIOD", "max"),
-        Start_Value=("ESTIMATE", "first"),
-        End_Value=("ESTIMATE", "last")
-    ).reset_index()
+    if summary is None:
+        return f"Error: No hospital bed data found for '{state}'."
 
-    return summary.to_string()
+    return summary
 
 @tool
 def analyze_emergency_visits() -> str:
     """Analyzes emergency department visits from a PDF file."""
-    file_path = os.path.join(EMERGING_DATA_DIRECTORY, "EmergencyDepartment_Visits.pdf")
+    pages = pdf_store.pages("EmergencyDepartment_Visits.pdf", max_pages=2)
 
-    if not os.path.exists(file_path):
-        return f"Error: File '{file_path}' not found."
+    if pages is None:
+        return "Error: File 'EmergencyDepartment_Visits.pdf' not found."
 
-    reader = PdfReader(file_path)
-    
-    total_pages = len(reader.pages)
-    pages_to_read = min(2, total_pages)
-    
-    content = "\n\n".join(reader.pages[i].extract_text() for i in range(pages_to_read) if reader.pages[i].extract_text())
+    content = "\n\n".join(page_text for page_text in pages if page_text)
 
-    return content if content else "Error: Unable to extract text from the PDF."
+    return compact_text(content) if content else "Error: Unable to extract text from the PDF."
 
 @tool
 def extract_hospital_utilization() -> str:
     """Extracts key insights from a hospital utilization research paper."""
-    file_path = os.path.join(DATA_DIRECTORY, "HospitalUtilization.pdf")
+    pages = pdf_store.pages("HospitalUtilization.pdf", max_pages=2)
     
-    if not os.path.exists(file_path):
-        return f"Error: File '{file_path}' not found."
+    if pages is None:
+        return "Error: File 'HospitalUtilization.pdf' not found."
 
-    reader = PdfReader(file_path)
-    
-    total_pages = len(reader.pages)
-    pages_to_read = min(2, total_pages)
-    
     content = ""
     
-    for i in range(pages_to_read):
-        page = reader.pages[i]
-        page_text = page.extract_text()
-        
+    for i, page_text in enumerate(pages):
         if page_text:
             content += page_text + "\n\n"
         else:
             content += f"Error: No text found on page {i+1}.\n"
     
-    return content if content else "Error: Unable to extract text from the PDF."
+    return compact_text(content) if content else "Error: Unable to extract text from the PDF."
 
 # ---- TOOLS FOR COVID-19 DATA ANALYSIS ----
 
@@ -126,43 +123,12 @@ def query_covid_cases_by_year(state: Optional[str] = None) -> str:
         state: Optional state filter. If None, returns data for all states.
     
     Returns:
-        JSON string with year-over-year COVID cases and deaths.
+        CSV table of COVID cases and deaths per year (one row per state and a column per year when state is None).
     """
     try:
-        conn = get_snowflake_connection()
-        cursor = conn.cursor()
-        
-        # Build the query with optional state filter
-        base_query = """
-        WITH state_agg AS 
-        (
-            SELECT 
-                EXTRACT(YEAR FROM date) AS year, 
-                state, 
-                MAX(cases) AS cases, 
-                MAX(deaths) AS deaths 
-            FROM COVID19_GLOBAL_DATA_ATLAS.HLS_COVID19_USA.COVID19_USA_CASES_DEATHS_BY_STATE_DAILY_NYT
-        """
-        
-        if state:
-            base_query += f"    WHERE state='{state}'\n"
-        
-        query = base_query + """
-            GROUP BY EXTRACT(YEAR FROM date), state
-            ORDER BY state, year)
-        SELECT year, state,
-            cases - LAG(cases, 1, 0) OVER (PARTITION BY state ORDER BY state, year) as cases,
-            deaths - LAG(deaths, 1, 0) OVER (PARTITION BY state ORDER BY state, year) as deaths    
-        FROM state_agg;
-        """
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        column_names = [desc[0] for desc in cursor.description]
-        df = pd.DataFrame(results, columns=column_names)
-        
-        close_connection(cursor, conn)
-        return df.to_json(orient="records")
+        # All states are aggregated once per refresh; this is a lookup into that table
+        table = covid_yearly_table.render(state)
+        return table if table is not None else f"No COVID case data found for '{state}'."
     
     except Exception as e:
         return f"Error executing COVID cases query: {str(e)}"
@@ -176,44 +142,24 @@ def query_vaccine_providers(state: Optional[str] = None) -> str:
         state: Optional state filter. If None, returns data for all states.
     
     Returns:
-        JSON string with vaccination provider counts by state.
-    """
-    us_states = {
-        "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
-        "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
-        "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
-        "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
-        "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS",
-        "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH",
-        "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY", "North Carolina": "NC",
-        "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA",
-        "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD", "Tennessee": "TN",
-        "Texas": "TX", "Utah": "UT", "Vermont": "VT", "Virginia": "VA", "Washington": "WA",
-        "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY"
-    }
+        CSV table of vaccination provider counts by state.
+    """
     try:
-        conn = get_snowflake_connection()
-        cursor = conn.cursor()
-        
-        query = """
-        SELECT LOC_ADMIN_STATE, COUNT(*) AS PROVIDER_COUNT 
-        FROM COVID19_GLOBAL_DATA_ATLAS.HLS_COVID19_USA.COVID_19_US_VACCINATING_PROVIDER_LOCATIONS
-        """
-        
-        if state:
-            state_code = us_states.get(state)
-            if state_code:
-                query += f" WHERE LOC_ADMIN_STATE = '{state_code}'"
-        
-        query += " GROUP BY LOC_ADMIN_STATE ORDER BY LOC_ADMIN_STATE"
-        
-        cursor.execute(query)
-        results = cursor.fetchall()
-        column_names = [desc[0] for desc in cursor.description]
-        df = pd.DataFrame(results, columns=column_names)
-        
-        close_connection(cursor, conn)
-        return df.to_json(orient="records")
+        state_code = US_STATES.get(state) if state else None
+
+        providers = reference_store.vaccine_providers_frame(state_code)
+        if providers is None:
+            query = vaccine_providers_query(state_code)
+            
+            with lease_connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute(query)
+                    providers = fetch_dataframe(cursor)
+                finally:
+                    close_cursor(cursor)
+
+        return encode_table(providers, max_rows=0)
     
     except Exception as e:
         return f"Error executing vaccine providers query: {str(e)}"
@@ -221,73 +167,19 @@ def query_vaccine_providers(state: Optional[str] = None) -> str:
 @tool
 def query_healthcare_access(state: Optional[str] = None) -> str:
     """
-    Retrieves healthcare access data including emergency departments, physician visits, 
+    Retrieves national (USA) healthcare access data including emergency departments, physician visits, 
     and delayed healthcare due to cost.
     
     Args:
-        state: Optional state filter. If None, returns national data.
+        state: Optional state. The data is national, so the result is the same for every state.
     
     Returns:
-        JSON string with healthcare access data.
+        CSV tables of yearly visits (in thousands) and delayed-care counts.
     """
     try:
-        conn = get_snowflake_connection()
-        cursor = conn.cursor()
-        
-        # Dictionary to store results
-        results = {
-            "emergency_dept_visits": [],
-            "physician_visits": [],
-            "delayed_healthcare_by_year": []
-        }
-        
-        # Query 1: Emergency department visits
-        query1 = """
-        SELECT PANEL, UNIT, YEAR, ESTIMATE 
-        FROM DIVERSITY_EQUITY_AND_INCLUSION__ACCESS_TO_HEALTHCARE.DEI_HEALTHCARE."Healthcare Visits by Age/Sex/Race - USA"
-        WHERE AGE = 'All ages' AND ESTIMATE > 0 AND UNIT = 'Number of visits in thousands'
-        AND PANEL = 'Hospital emergency departments'
-        """
-            
-        query1 += " ORDER BY YEAR DESC"
-        
-        cursor.execute(query1)
-        results1 = cursor.fetchall()
-        column_names1 = [desc[0] for desc in cursor.description]
-        df1 = pd.DataFrame(results1, columns=column_names1)
-        results["emergency_dept_visits"] = json.loads(df1.to_json(orient="records"))
-        
-        # Query 2: Physician office visits
-        query2 = """
-        SELECT PANEL, UNIT, YEAR, ESTIMATE 
-        FROM DIVERSITY_EQUITY_AND_INCLUSION__ACCESS_TO_HEALTHCARE.DEI_HEALTHCARE."Healthcare Visits by Age/Sex/Race - USA"
-        WHERE AGE = 'All ages' AND ESTIMATE > 0 AND UNIT = 'Number of visits in thousands'
-        AND PANEL = 'Physician offices'
-        """
-            
-        query2 += " ORDER BY YEAR DESC"
-        
-        cursor.execute(query2)
-        results2 = cursor.fetchall()
-        column_names2 = [desc[0] for desc in cursor.description]
-        df2 = pd.DataFrame(results2, columns=column_names2)
-        results["physician_visits"] = json.loads(df2.to_json(orient="records"))
-        
-        # Query 3: Delayed healthcare by year
-        query3 = """
-        SELECT YEAR, COUNT(*) AS COUNT 
-        FROM DIVERSITY_EQUITY_AND_INCLUSION__ACCESS_TO_HEALTHCARE.DEI_HEALTHCARE."Delayed Healthcare Due to Cost - USA"
-        GROUP BY YEAR
-        """
-        
-        cursor.execute(query3)
-        results3 = cursor.fetchall()
-        column_names3 = [desc[0] for desc in cursor.description]
-        df3 = pd.DataFrame(results3, columns=column_names3)
-        results["delayed_healthcare_by_year"] = json.loads(df3.to_json(orient="records"))
-        
-        close_connection(cursor, conn)
-        return json.dumps(results)
+        # The source tables are national, so `state` doesn't change the result:
+        # it is built once per refresh window and shared by every state's report
+        return national_data.get("healthcare_access")
     
     except Exception as e:
         return f"Error executing healthcare access query: {str(e)}"
@@ -303,34 +195,58 @@ def web_search(query: str) -> str:
         query: The search query, related to COVID-19 or healthcare.
     
     Returns:
-        JSON string containing search results.
+        The top results, one per line: title, URL and a short snippet.
     """
     try:
-        response = tavily_client.search(query=query)
-        return response
+        return encode_search_results(tavily_cache.search(query))
     
     except Exception as e:
         print(f"Error in web search: {str(e)}")
-        return json.dumps({"results": []})
+        return "No search results."
+
+# Pages fetched concurrently per call, and the per-page size cap (~4 characters per token)
+FETCH_WEB_CONTENT_WORKERS = int(os.getenv("FETCH_WEB_CONTENT_WORKERS", "4"))
+FETCH_WEB_CONTENT_TOKENS_PER_URL = int(os.getenv("FETCH_WEB_CONTENT_TOKENS_PER_URL", "1500"))
 
 @tool
 def fetch_web_content(url: list) -> str:
     """
-    Fetches content from specific URLs for detailed information.
+    Fetches content from specific URLs for detailed information. All URLs are fetched in one call.
     
     Args:
         url: List of URLs to fetch content from.
     
     Returns:
-        The extracted content from the webpages.
+        The extracted content of every webpage, each under its own "Source:" header.
     """
-    try:
-        response = tavily_client.extract(urls=url)
-        return response["results"][0]["raw_content"]
-    
-    except Exception as e:
-        print(f"Error in fetch web content: {str(e)}")
-        return f"This is mock content about COVID-19 research and data analysis."
+    urls = [url] if isinstance(url, str) else list(url)
+    if not urls:
+        return "Error: No URLs provided."
+
+    def extract(page_url):
+        # A failing page is reported in its own section instead of discarding the others
+        try:
+            return tavily_cache.extract(page_url)
+        except Exception as e:
+            print(f"Error in fetch web content for {page_url}: {str(e)}")
+            return {"results": [], "error": str(e)}
+
+    # One extract per URL on a bounded pool: the call takes as long as the slowest page
+    with ThreadPoolExecutor(max_workers=min(FETCH_WEB_CONTENT_WORKERS, len(urls))) as pool:
+        responses = list(pool.map(extract, urls))
+
+    sections = []
+    for page_url, response in zip(urls, responses):
+        if response.get("results"):
+            content = truncate_to_tokens(
+                compact_text(response["results"][0]["raw_content"] or ""), FETCH_WEB_CONTENT_TOKENS_PER_URL
+            )
+        elif response.get("error"):
+            content = f"Error: Unable to fetch this URL: {response['error']}"
+        else:
+            content = "Error: Unable to extract content from this URL."
+        sections.append(f"### Source: {page_url}\n{content}")
+    return "\n\n".join(sections)
 
 @tool
 def web_search_emergingchallanges(query: str) -> str:
@@ -341,103 +257,128 @@ def web_search_emergingchallanges(query: str) -> str:
         query (str): The search query, should be related to Health Care Staffing Shortages and Potential National Hospital Bed Shortage
    
     Returns:
-        str: JSON string containing search results.
+        str: The top results, one per line: title, URL and a short snippet.
     """
     try:
-        response = tavily_client.search(
-        query=query
-        )
-        return response
+        return encode_search_results(tavily_cache.search(query))
    
     except Exception as e:
         print(f"Error in web search: {str(e)}")
         # Return empty results on error
-        return json.dumps({"results": []})
-       
-    except Exception as e:
-        return f"Error performing web search: {str(e)}"
-   
- 
+        return "No search results."
 
-@tool
-def fetch_web_content(url: list) -> str:
-    """
-    Fetches content from a specific URL for detailed information.
-   
-    Args:
-        url (list): List of URL's to fetch content from.
-   
-    Returns:
-        str: The extracted content from the webpage.
-    """
-    try:
-        response = tavily_client.extract(
-            urls=url
-        )
-        return response["results"][0]["raw_content"]
-   
-    except Exception as e:
-        print(f"Error in fetch web content: {str(e)}")
-        # Return empty results on error
-        return f"This is mock content about COVID-19 research and data analysis."
-       
-    except Exception as e:
-        return f"Error fetching web content: {str(e)}"
-    
 
-### 3️⃣ Agent: Extract Hospital Utilization Data (PDF)
-DATA_DIRECTORY=".\\agents\\emerging_challenges\\data"
 @tool
 def extract_emergingchallenges_pdf() -> str:
     """
     Reads the first three pages of a PDF file from the local directory and returns its content as a string.
     """
-    file_path = os.path.join(DATA_DIRECTORY, "Emerging Challenges.pdf")
+    pages = pdf_store.pages("Emerging Challenges.pdf", max_pages=3)
 
-    if not os.path.exists(file_path):
-        return f"Error: File '{file_path}' not found. Please check the directory."
-    reader = PdfReader(file_path)
-    # Check number of pages
-    total_pages = len(reader.pages)
-    print(f"Total pages in PDF: {total_pages}")
-    pages_to_read = min(3, total_pages)
+    if pages is None:
+        return "Error: File 'Emerging Challenges.pdf' not found. Please check the directory."
     content = ""
-    for i in range(pages_to_read):
-        page = reader.pages[i]
-        content += page.extract_text() + "\n\n"
-    return content if content else "Error: Unable to extract text from the PDF."
+    for page_text in pages:
+        content += page_text + "\n\n"
+    return compact_text(content) if content else "Error: Unable to extract text from the PDF."
+
+
+# ---- TOOL PREFETCH ----
 
+# Run the tool calls the prompts spell out before the agents start, and give them the results
+AGENT_PREFETCH = os.getenv("AGENT_PREFETCH", "true").lower() in ("1", "true", "yes")
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "8"))
+
+PREFETCH_NOTE = """PREFETCHED DATA:
+    The data the steps above ask you to gather has already been retrieved; each result is below, under the tool call that produced it.
+    Use these results directly instead of gathering that data again. Use your tools (or agents) only for follow-ups the results
+    don't cover, for example fetching the full content of a search result."""
+
+def call_label(tool_fn, args):
+    """How a prefetched call is shown to the agent, e.g. query_vaccine_providers("Illinois")."""
+    return f"{tool_fn.name}({', '.join(json.dumps(arg) for arg in args)})"
+
+def prefetch_tool_calls(calls, stage=None):
+    """
+    Runs known tool calls concurrently, once each.
+    
+    Args:
+        calls: (tool, args) pairs
+        stage: Optional ReportStage the calls are traced under
+    
+    Returns:
+        call label -> tool output (or the error, so the agent can retry the call itself)
+    """
+    if not calls:
+        return {}
+    traced = stage_tools(stage, [tool_fn for tool_fn, _ in calls])
+    with ThreadPoolExecutor(max_workers=min(PREFETCH_WORKERS, len(calls)), thread_name_prefix="tool-prefetch") as pool:
+        futures = {
+            call_label(tool_fn, args): pool.submit(traced_fn, *args)
+            for traced_fn, (tool_fn, args) in zip(traced, calls)
+        }
+        results = {}
+        for label, future in futures.items():
+            try:
+                results[label] = future.result()
+            except Exception as e:
+                results[label] = f"Error: {str(e)}"
+    return results
+
+def format_prefetched(results):
+    """The prefetch results as a prompt block (empty when nothing was prefetched)."""
+    if not results:
+        return ""
+    blocks = "\n\n".join(f"### {label}\n{output}" for label, output in results.items())
+    return f"{PREFETCH_NOTE}\n\n{blocks}"
+
+def prefetch_context(calls, stage=None, name="agent"):
+    """Prefetches `calls` (when AGENT_PREFETCH is on) and returns the prompt block to append to the agent's task."""
+    if not AGENT_PREFETCH:
+        return ""
+    started = time.monotonic()
+    results = prefetch_tool_calls(calls, stage)
+    print(f"⏱️ {name} data prefetched in {round(time.monotonic() - started, 3)}s ({len(results)} calls)")
+    return format_prefetched(results)
 
 # ---- COVID ANALYSIS FUNCTION ----
 
-def run_covid_analysis(state="Illinois"):
+def run_covid_analysis(state="Illinois", stage=None):
     """
     Runs the COVID-19 data analysis for a specified state.
     
     Args:
         state: The state to analyze (default: Illinois)
+        stage: Optional ReportStage used to interrupt the agent on timeout
     
     Returns:
         Agent output containing the comprehensive report
     """
     # Initialize the model
-    model_id = "xai/grok-2-1212"
-    model = LiteLLMModel(model_id=model_id, api_key=os.getenv("XAI_API_KEY"))
+    model = get_model(MODEL_ID)
     
     # Create the agent with all specialized tools
     agent = CodeAgent(
-        tools=[
+        tools=stage_tools(stage, [
             query_covid_cases_by_year,
             query_vaccine_providers,
             query_healthcare_access,
             web_search,
             fetch_web_content
-        ],
+        ]),
         model=model,
         max_steps=25, # Increased from 20 to allow for more comprehensive analysis
         additional_authorized_imports=['pandas', 'json', 'requests', 'matplotlib', 'seaborn'],
         verbosity_level=2,
+        # Old tool outputs and code are digested once memory passes the token budget
+        step_callbacks=[compact_memory],
     )
+    if stage:
+        stage.track(agent, "covid_analysis_agent")
+    
+    # Every query and search the steps below ask for, run up front
+    data_calls, search_calls = covid_tool_calls(state)
+    prefetched = prefetch_context(list(data_calls.values()) + list(search_calls.values()), stage, "COVID analysis")
     
     # Run the agent with a comprehensive prompt
     agent_output = agent.run(f"""
@@ -522,62 +463,227 @@ def run_covid_analysis(state="Illinois"):
     [In-depth forecast of healthcare transformation - minimum 4-5 substantial paragraphs]
     
     IMPORTANT: Your output MUST be a COMPLETE REPORT with all sections fully developed. Do not leave any sections incomplete or with placeholder text. The final report should be comprehensive (equivalent to 9-10 pages), evidence-based, properly formatted in markdown, and suitable for presentation to healthcare policymakers.
+
+    {prefetched}
     """)
     
     return agent_output
 
-# Update the historical healthcare context prompt to generate more comprehensive content
-def generate_integrated_report(state="California"):
+# ---- SECTION-PARALLEL COVID ANALYSIS ----
+
+# "sections" writes each COVID section with its own small agent in parallel; "single" uses one agent for all of them
+COVID_ANALYSIS_MODE = os.getenv("COVID_ANALYSIS_MODE", "sections")
+COVID_SECTION_WORKERS = int(os.getenv("COVID_SECTION_WORKERS", "6"))
+COVID_SECTION_MAX_STEPS = int(os.getenv("COVID_SECTION_MAX_STEPS", "6"))
+
+# Sections of the COVID analysis in report order: the headings each agent writes,
+# the prefetched data it is given and the web search run for it
+COVID_SECTIONS = [
+    {
+        "name": "introduction",
+        "headings": ["## Executive Summary", "## Introduction"],
+        "data": ["covid_cases", "healthcare_access", "vaccine_providers"],
+        "search": "{state} COVID-19 healthcare impact overview",
+        "instructions": """Write a comprehensive Executive Summary (1 full page) giving a detailed overview of the key findings
+       and an Introduction (1-2 full pages) that explains the context of COVID-19 in {state} and the scope of the report.""",
+    },
+    {
+        "name": "timeline",
+        "headings": ["## Pandemic Timeline and Healthcare Response"],
+        "data": ["covid_cases"],
+        "search": "{state} COVID-19 timeline healthcare response policy",
+        "instructions": """Thoroughly analyze the COVID cases/deaths data and create a detailed timeline with key events and
+       healthcare system responses. Identify turning points and policy changes. Include at least 5 paragraphs with specific
+       data points and dates.""",
+    },
+    {
+        "name": "comparative",
+        "headings": ["## Comparative Analysis: Pre-Pandemic vs. Pandemic Healthcare"],
+        "data": ["healthcare_access"],
+        "search": "{state} pre-pandemic vs pandemic healthcare expenditure",
+        "instructions": """Focus on the emergency department and physician visits data. Create a detailed comparative analysis of
+       the pre-pandemic baseline vs. pandemic changes, with at least 4-5 paragraphs of quantitative comparisons.""",
+    },
+    {
+        "name": "social_determinants",
+        "headings": ["## Social Determinants and COVID-19 Impact"],
+        "data": ["healthcare_access"],
+        "search": "{state} social determinants health COVID hotspots",
+        "instructions": """Analyze the delayed healthcare data in depth. Identify vulnerable populations and geographic/demographic
+       patterns. Include at least 4-5 paragraphs discussing disparities and social factors.""",
+    },
+    {
+        "name": "providers",
+        "headings": ["## Healthcare Provider Availability"],
+        "data": ["vaccine_providers"],
+        "search": "{state} healthcare provider availability COVID impact",
+        "instructions": """Analyze provider distribution, shortages, and adaptations. Include at least 4-5 paragraphs with specific
+       provider metrics and distribution data.""",
+    },
+    {
+        "name": "long_term",
+        "headings": ["## Long-Term Implications"],
+        "data": ["covid_cases"],
+        "search": "{state} long-term effects COVID healthcare access",
+        "instructions": """Analyze potential lasting changes to healthcare delivery and access. Discuss policy implications and
+       system transformations. Include at least 4-5 paragraphs with detailed projections and industry analysis.""",
+    },
+]
+
+def covid_tool_calls(state):
     """
-    Generates a comprehensive integrated report that combines COVID-19 impact analysis
-    with historical healthcare system data, and adds recommendations and conclusion.
+    The tool calls the COVID analysis needs, as (tool, args) pairs.
+    
+    Returns:
+        (data_calls, search_calls): data name -> call, and section name -> its web search
+    """
+    data_calls = {
+        "covid_cases": (query_covid_cases_by_year, (state,)),
+        "healthcare_access": (query_healthcare_access, (state,)),
+        "vaccine_providers": (query_vaccine_providers, (state,)),
+    }
+    search_calls = {section["name"]: (web_search, (section["search"].format(state=state),)) for section in COVID_SECTIONS}
+    return data_calls, search_calls
+
+def prefetch_covid_section_data(state, stage=None):
+    """
+    Runs every tool call the COVID sections need, concurrently and once each.
+    
+    Returns:
+        (data, searches): data name -> tool output, and section name -> search results
+    """
+    data_calls, search_calls = covid_tool_calls(state)
+    results = prefetch_tool_calls(list(data_calls.values()) + list(search_calls.values()), stage)
+    data = {name: results[call_label(*call)] for name, call in data_calls.items()}
+    searches = {name: results[call_label(*call)] for name, call in search_calls.items()}
+    return data, searches
+
+def ensure_heading(markdown, heading):
+    """Prefixes `heading` when an agent's section output doesn't already start with it."""
+    text = strip_outer_fence(markdown).strip()
+    return text if text.startswith(heading) else f"{heading}\n\n{text}"
+
+def write_covid_section(state, section, data, search_results, model, stage=None):
+    """Writes one section of the COVID analysis with a small agent that only sees that section's inputs."""
+    agent = CodeAgent(
+        tools=stage_tools(stage, [fetch_web_content]),
+        model=model,
+        max_steps=COVID_SECTION_MAX_STEPS,
+        additional_authorized_imports=['pandas', 'json'],
+        verbosity_level=1,
+        step_callbacks=[compact_memory],
+    )
+    if stage:
+        stage.track(agent, f"covid_section_{section['name']}_agent")
+
+    data_block = "\n\n".join(f"{name}:\n{data[name]}" for name in section["data"])
+    headings = "\n".join(section["headings"])
+    output = agent.run(f"""
+    You are a COVID-19 data analyst writing part of a COMPREHENSIVE report on how the COVID-19 pandemic transformed healthcare in {state}. Other analysts are writing the remaining sections in parallel; write ONLY the section(s) below.
+
+    CRITICAL GUIDELINES:
+    - Each section should be detailed and evidence-based (minimum 4-5 substantial paragraphs per section)
+    - Include detailed quantitative analysis using the data provided below
+    - The data has already been retrieved for you; do not ask for it again
+    - You may call fetch_web_content once, with several of the URLs below, if a search snippet is not detailed enough
+    - Return the finished markdown with final_answer(), starting with the heading(s) below and with no other top-level title
+
+    TASK:
+       {section["instructions"].format(state=state)}
+
+    HEADINGS (in this order):
+    {headings}
+
+    DATA:
+    {data_block}
+
+    WEB SEARCH RESULTS for "{section["search"].format(state=state)}":
+    {search_results}
+    """)
+    return ensure_heading(output, section["headings"][0])
+
+def run_covid_sections(state="Illinois", stage=None):
+    """
+    Runs the COVID-19 analysis with one small agent per section, in parallel.
+    
+    The tool data every section needs is fetched up front, concurrently, and each
+    agent is given only its own slice of it, so wall time follows the slowest
+    section and each agent's context stays small.
+    
+    Args:
+        state: The state to analyze (default: Illinois)
+        stage: Optional ReportStage used to interrupt the agents on timeout
+    
+    Returns:
+        The assembled COVID-19 analysis, in the same structure as run_covid_analysis
+    """
+    model = get_model(MODEL_ID)
+
+    prefetch_started = time.monotonic()
+    data, searches = prefetch_covid_section_data(state, stage)
+    print(f"⏱️ COVID section data prefetched in {round(time.monotonic() - prefetch_started, 3)}s")
+
+    with ThreadPoolExecutor(max_workers=COVID_SECTION_WORKERS, thread_name_prefix="covid-section") as pool:
+        futures = [
+            pool.submit(write_covid_section, state, section, data, searches[section["name"]], model, stage)
+            for section in COVID_SECTIONS
+        ]
+        sections = [future.result() for future in futures]
+
+    return "\n\n".join([report_title(state)] + sections)
+
+# ---- HISTORICAL CONTEXT FUNCTION ----
+
+def run_historical_context(state="California", stage=None):
+    """
+    Runs the historical healthcare system and emerging challenges analysis for a state.
     
     Args:
         state: The state to analyze (default: California)
-        
+        stage: Optional ReportStage used to interrupt the agents on timeout
+    
     Returns:
-        Comprehensive integrated report
+        Agent output containing the "Historical Healthcare System Context"
+        and "Emerging Challenges" sections
     """
     # Initialize Model
-    model_id = "xai/grok-2-1212"
-    model = LiteLLMModel(model_id=model_id, api_key=os.getenv("XAI_API_KEY"))
+    model = get_model(MODEL_ID)
+    # Sub-agents over static local data see the same prompts every run, so their responses can be replayed
+    static_model = get_model(MODEL_ID, cached=True)
     
-    # First, run COVID-19 analysis
-    print("\n🔍 **Running COVID-19 Analysis**")
-    covid_analysis_result = run_covid_analysis(state)
-    emergingchallenges_pdf_agent = ToolCallingAgent(tools=[extract_emergingchallenges_pdf], model=model,name="emergingchallenges_pdf_agent",description="Analyzes potential isssues for emerging chanllenges in the health sector for US")
+    emergingchallenges_pdf_agent = ToolCallingAgent(tools=stage_tools(stage, [extract_emergingchallenges_pdf]), model=static_model,name="emergingchallenges_pdf_agent",description="Analyzes potential isssues for emerging chanllenges in the health sector for US")
     
     web_search_agent = ToolCallingAgent(
-        tools=[web_search_emergingchallanges], model=model,
+        tools=stage_tools(stage, [web_search_emergingchallanges]), model=model,
         name="web_search_agent",
         description="Web-searching potential issues for emerging challenges in the health sector for US"
     )
     
     # Fetch Web Content Agent
     fetch_web_content_agent = ToolCallingAgent(
-        tools=[fetch_web_content], model=model,
+        tools=stage_tools(stage, [fetch_web_content]), model=model,
         name="fetch_web_content_agent",
-        description="Fetches detailed content from web sources related to emerging healthcare challenges."
+        description="Fetches detailed content from web sources related to emerging healthcare challenges. Accepts several URLs at once."
     )
     
     # Create and run specialized agents for historical healthcare data
     hospital_beds_agent = ToolCallingAgent(
-        tools=[analyze_hospital_beds], 
-        model=model,
+        tools=stage_tools(stage, [analyze_hospital_beds]), 
+        model=static_model,
         name="hospital_beds_agent",
-        description="Analyzes Community hospital bed availability trends"
+        description="Analyzes Community hospital bed availability trends for a given state and the US overall"
     )
     
     emergency_visits_agent = ToolCallingAgent(
-        tools=[analyze_emergency_visits], 
-        model=model,
+        tools=stage_tools(stage, [analyze_emergency_visits]), 
+        model=static_model,
         name="emergency_visits_agent",
         description="Analyzes Emergency department visits trends for US"
     )
     
     hospital_utilization_agent = ToolCallingAgent(
-        tools=[extract_hospital_utilization], 
-        model=model,
+        tools=stage_tools(stage, [extract_hospital_utilization]), 
+        model=static_model,
         name="hospital_utilization_agent",
         description="Analyzes hospital utilization trends for US"
     )
@@ -588,12 +694,27 @@ def generate_integrated_report(state="California"):
         model=model,
         managed_agents=[hospital_beds_agent, emergency_visits_agent, hospital_utilization_agent,
                         emergingchallenges_pdf_agent, web_search_agent, fetch_web_content_agent],
-        additional_authorized_imports=["time", "numpy", "pandas", "pypdf", "os"]
+        additional_authorized_imports=["time", "numpy", "pandas", "pypdf", "os"],
+        step_callbacks=[compact_memory],
     )
+    if stage:
+        for agent in (healthcare_emerging_agent, hospital_beds_agent, emergency_visits_agent,
+                      hospital_utilization_agent, emergingchallenges_pdf_agent, web_search_agent,
+                      fetch_web_content_agent):
+            stage.track(agent, "historical_context_agent" if agent is healthcare_emerging_agent else None)
+    
+    # The sub-agents' tool calls (steps 1-5 below), run up front; the sub-agents stay available for follow-ups
+    prefetched = prefetch_context([
+        (analyze_hospital_beds, (state,)),
+        (analyze_emergency_visits, ()),
+        (extract_hospital_utilization, ()),
+        (extract_emergingchallenges_pdf, ()),
+        (web_search_emergingchallanges, (f"{state} healthcare system historical trends and challenges",)),
+    ], stage, "Historical context")
     
     # Run the historical context agent to create a more comprehensive historical healthcare context section
     print("\n🔍 **Generating Historical Healthcare Context Section**")
-    healthcare_emerging_context_section = healthcare_emerging_agent.run(f"""
+    return healthcare_emerging_agent.run(f"""
     You are an expert healthcare data analyst tasked with creating a detailed section on historical healthcare system data for {state}. This will form a critical part of a 20-page comprehensive report.
     
     You will have access to:
@@ -604,12 +725,12 @@ def generate_integrated_report(state="California"):
     
     Follow these steps:
     
-    1. First, use hospital_beds_agent to analyze hospital bed availability trends
+    1. First, use hospital_beds_agent to analyze hospital bed availability trends for {state} (compared with the national trend)
     2. Next, use emergency_visits_agent to analyze emergency department visit patterns
     3. Then, use hospital_utilization_agent to analyze hospital utilization research findings
     4. Then use emergingchallenges_pdf_agent to research emerging challenges in healthcare
     5. Use web_search_agent with the query "{state} healthcare system historical trends and challenges" to find state-specific information
-    6. Use fetch_web_content_agent to get more detail on the most relevant search results
+    6. Use fetch_web_content_agent to get more detail on the most relevant search results (pass all relevant URLs in a single request)
     
     Create TWO detailed sections:
     
@@ -632,85 +753,245 @@ def generate_integrated_report(state="California"):
     "## Emerging Challenges"
     
     Each section should be extremely comprehensive, data-driven, and equivalent to 3-4 pages of a report.
+
+    {prefetched}
     """)
 
-    # Create the final agent to combine results and add recommendations and conclusion
-    final_report_agent = CodeAgent(
-        tools=[],
-        model=model,
-        additional_authorized_imports=["time", "numpy", "pandas"]
-    )
+# ---- CONCURRENT STAGE RUNNER ----
+
+# Per-stage timeouts in seconds (overridable through the environment)
+COVID_STAGE_TIMEOUT = float(os.getenv("COVID_STAGE_TIMEOUT", "1200"))
+HISTORICAL_STAGE_TIMEOUT = float(os.getenv("HISTORICAL_STAGE_TIMEOUT", "1200"))
+
+class ReportStage:
+    """Tracks the agents started by one report stage so they can be interrupted, and traces their runs."""
+
+    def __init__(self, name, trace=None):
+        self.name = name
+        self.trace = trace
+        self.cancelled = threading.Event()
+        self._agents = []
+
+    def track(self, agent, name=None):
+        instrument_agent(agent, name or agent.name or f"{self.name}_agent", trace=self.trace, stage=self.name)
+        self._agents.append(agent)
+        if self.cancelled.is_set():
+            agent.interrupt()
+        return agent
+
+    def cancel(self):
+        """Interrupts every tracked agent; smolagents stops them after their current step."""
+        self.cancelled.set()
+        for agent in self._agents:
+            agent.interrupt()
+
+def stage_tools(stage, tools):
+    """The tools with each call traced under the stage (unchanged outside a report stage)."""
+    if stage is None:
+        return tools
+    return [TracedTool(tool, trace=stage.trace, stage=stage.name) for tool in tools]
+
+def notify_progress(on_progress, event, **data):
+    """Sends a progress event to the caller's callback, never letting a callback error break the report."""
+    if on_progress is None:
+        return
+    try:
+        on_progress({"event": event, **data})
+    except Exception as e:
+        print(f"Error in progress callback: {str(e)}")
 
-    # Update the final report integration prompt to ensure correct structure and comprehensive recommendations
-    print("\n🔍 **Generating Final Integrated Report with Recommendations and Conclusion**")
-    integrated_report = final_report_agent.run(f"""
-    You are an expert healthcare data analyst tasked with integrating a COVID-19 impact analysis with historical healthcare system data for {state}, and adding comprehensive recommendations and conclusion sections. The final report must be equivalent to a 20-page document.
-    
-    You have two main inputs:
-    1. The COVID-19 analysis (approximately 9-10 pages)
-    2. The Historical Healthcare System and Emerging Challenges context sections (approximately 6-8 pages)
-    
-    Your task is to:
-    1. Combine these inputs into one cohesive report following the EXACT order specified below
-    2. Add two new comprehensive sections: "Recommendations" and "Conclusion"
-    
-    CRITICAL: Follow this EXACT structure in your final report (section names must match exactly):
-    
-    # COVID-19 Impact on Healthcare in {state}: Comprehensive Analysis
-    
-    ## Executive Summary
-    [Keep this exactly as provided in the COVID-19 analysis]
-    
-    ## Introduction
-    [Keep this exactly as provided in the COVID-19 analysis]
-    
-    ## Pandemic Timeline and Healthcare Response
-    [Keep this exactly as provided in the COVID-19 analysis]
-    
-    ## Comparative Analysis: Pre-Pandemic vs. Pandemic Healthcare
-    [Keep this exactly as provided in the COVID-19 analysis]
+def _run_timed_stage(stage, fn, timings, on_progress=None):
+    notify_progress(on_progress, "stage_started", stage=stage.name)
+    started = time.monotonic()
+    error = None
+    try:
+        result = fn(stage)
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        timings[stage.name] = round(time.monotonic() - started, 3)
+        record_stage(stage.name, timings[stage.name], error=error, trace=stage.trace)
+        print(f"⏱️ Stage '{stage.name}' finished in {timings[stage.name]}s")
+    notify_progress(on_progress, "stage_completed", stage=stage.name, seconds=timings[stage.name], markdown=str(result))
+    return result
+
+def run_stages_concurrently(stages, timings, on_progress=None, trace=None):
+    """
+    Runs independent report stages in parallel and waits for all of them.
     
-    ## Social Determinants and COVID-19 Impact
-    [Keep this exactly as provided in the COVID-19 analysis]
+    Args:
+        stages: Mapping of stage name -> (callable taking a ReportStage, timeout in seconds)
+        timings: Dict that receives the wall time of each stage in seconds
+        on_progress: Optional callback receiving a "stage_completed" event (with the stage's markdown) as each stage finishes
+        trace: Optional ReportTrace that receives the stages' tool and agent spans
     
-    ## Healthcare Provider Availability
-    [Keep this exactly as provided in the COVID-19 analysis]
+    Returns:
+        Mapping of stage name -> stage result
     
-    ## Long-Term Implications
-    [Keep this exactly as provided in the COVID-19 analysis]
+    If any stage fails or exceeds its timeout, the remaining stages are
+    interrupted and the error is raised.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix="report-stage")
+    started = time.monotonic()
+    futures = {}
+    for name, (fn, timeout) in stages.items():
+        stage = ReportStage(name, trace)
+        future = executor.submit(_run_timed_stage, stage, fn, timings, on_progress)
+        futures[future] = (stage, started + timeout)
+
+    def cancel_pending():
+        for future in pending:
+            future.cancel()
+            futures[future][0].cancel()
+
+    pending = set(futures)
+    try:
+        while pending:
+            now = time.monotonic()
+            expired = [futures[f][0].name for f in pending if futures[f][1] <= now]
+            if expired:
+                cancel_pending()
+                raise TimeoutError(f"Report stage(s) timed out: {', '.join(expired)}")
+            next_deadline = min(futures[f][1] for f in pending)
+            done, pending = wait(pending, timeout=next_deadline - now, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    cancel_pending()
+                    raise future.exception()
+        return {stage.name: future.result() for future, (stage, _) in futures.items()}
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+# ---- INTEGRATED REPORT ----
+
+def write_closing_sections(state, covid_analysis_result, healthcare_emerging_context_section, model, trace=None):
+    """
+    Writes the Recommendations and Conclusion sections from a compact digest of the report.
     
-    ## Historical Healthcare System Context
-    [Insert this content exactly as provided in the historical context section]
+    Returns:
+        Markdown with the "## Recommendations" and "## Conclusion" sections
+    """
+    digest = section_digest(
+        (covid_analysis_result, COVID_ANALYSIS_HEADINGS),
+        (healthcare_emerging_context_section, HISTORICAL_CONTEXT_HEADINGS),
+    )
+    prompt = f"""
+    You are an expert healthcare data analyst finishing a comprehensive report on how the COVID-19 pandemic transformed healthcare in {state}, in the context of its historical healthcare system data. The report's other sections are already written; below is a digest of each of them.
     
-    ## Emerging Challenges
-    [Insert this content exactly as provided in the emerging challenges section]
+    Write the two closing sections of the report:
     
     ## Recommendations
-    [Create a new comprehensive section with detailed, actionable recommendations based on all previous sections. This should be a minimum of 5-6 substantial paragraphs, equivalent to 2-3 pages.]
+    [Detailed, actionable recommendations based on all previous sections. This should be a minimum of 5-6 substantial paragraphs, equivalent to 2-3 pages.]
     
     ## Conclusion
-    [Create a new comprehensive conclusion that synthesizes all key findings and reinforces the most critical points. This should be a minimum of 3-4 substantial paragraphs, equivalent to 1-2 pages.]
+    [A comprehensive conclusion that synthesizes all key findings and reinforces the most critical points. This should be a minimum of 3-4 substantial paragraphs, equivalent to 1-2 pages.]
+    
+    IMPORTANT GUIDELINES:
+    - Output ONLY these two sections, in markdown, with the headings exactly as above
+    - Ground every recommendation in the findings and figures from the digest
+    - Do not repeat or rewrite the other sections
     
-    The COVID-19 analysis is:
-    {covid_analysis_result}
+    DIGEST OF THE REPORT:
+    {digest}
+    """
+    started = time.monotonic()
+    response = model.generate([ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": prompt}])])
+    usage = response.token_usage
+    record_agent(
+        "closing_sections", time.monotonic() - started, stage="final_report", trace=trace, steps=1,
+        input_tokens=usage.input_tokens if usage else 0, output_tokens=usage.output_tokens if usage else 0,
+    )
+    return response.content
+
+def generate_integrated_report(state="California", timings=None, refresh=False, on_progress=None, trace=None):
+    """
+    Generates a comprehensive integrated report that combines COVID-19 impact analysis
+    with historical healthcare system data, and adds recommendations and conclusion.
     
-    The Historical Healthcare System and Emerging Challenges Context sections are:
-    {healthcare_emerging_context_section}
+    The COVID-19 analysis and the historical context are independent, so they run
+    concurrently; only the final integration waits for both. Their sections are
+    assembled by heading without another model pass, and the model writes just the
+    Recommendations and Conclusion from a compact digest of them.
     
-    IMPORTANT GUIDELINES:
-    - Maintain ALL section headings exactly as specified
-    - Do not modify the content of the provided sections
-    - Ensure your new Recommendations and Conclusion sections are comprehensive and data-driven
-    - Format everything in proper markdown with clear heading hierarchy
-    - Your final report should be equivalent to approximately 20 pages (Executive Summary through Conclusion)
-    - Ensure seamless transitions between all sections
-    """)
+    Completed reports are cached on disk, keyed by state, prompt version, model id
+    and input-data fingerprints, so repeat requests skip the agents entirely.
+    
+    Args:
+        state: The state to analyze (default: California)
+        timings: Optional dict that receives per-stage wall times in seconds
+        refresh: Bypass the report cache and regenerate (the new report is still cached)
+        on_progress: Optional callback receiving progress events (dicts with an "event" key)
+            and the partial markdown of each stage as soon as it completes
+        trace: Optional ReportTrace that receives per-stage, per-tool and per-agent timings and token counts
+        
+    Returns:
+        Comprehensive integrated report
+    """
+    timings = {} if timings is None else timings
+    trace = ReportTrace(state) if trace is None else trace
+    report_started = time.monotonic()
+
+    cache_key = report_cache.make_key(
+        state=state, prompt_version=PROMPT_VERSION, model_id=MODEL_ID,
+        covid_mode=COVID_ANALYSIS_MODE, prefetch=AGENT_PREFETCH, data=data_fingerprints()
+    )
+    if not refresh:
+        cached_report = report_cache.get(cache_key)
+        if cached_report is not None:
+            timings["cache"] = "hit"
+            metrics.inc("report_generations_total", cache="hit")
+            timings["total"] = round(time.monotonic() - report_started, 3)
+            print(f"\n📦 **Serving cached report for {state}**")
+            notify_progress(on_progress, "report", cached=True, markdown=cached_report)
+            return cached_report
+    timings["cache"] = "refresh" if refresh else "miss"
+    metrics.inc("report_generations_total", cache=timings["cache"])
+
+    # Initialize Model
+    model = get_model(MODEL_ID)
+    
+    print("\n🔍 **Running COVID-19 Analysis and Historical Healthcare Context in parallel**")
+    covid_stage = run_covid_sections if COVID_ANALYSIS_MODE == "sections" else run_covid_analysis
+    stage_results = run_stages_concurrently({
+        "covid_analysis": (lambda stage: covid_stage(state, stage=stage), COVID_STAGE_TIMEOUT),
+        "historical_context": (lambda stage: run_historical_context(state, stage=stage), HISTORICAL_STAGE_TIMEOUT),
+    }, timings, on_progress, trace)
+    covid_analysis_result = stage_results["covid_analysis"]
+    healthcare_emerging_context_section = stage_results["historical_context"]
+
+    # The provided sections are stitched together as-is; the model only writes the closing sections
+    print("\n🔍 **Generating Recommendations and Conclusion**")
+    notify_progress(on_progress, "stage_started", stage="final_report")
+    final_started = time.monotonic()
+    closing_sections = write_closing_sections(
+        state, covid_analysis_result, healthcare_emerging_context_section, model, trace
+    )
+    # Each stage fills only its own headings; output it could not place is kept under its first heading
+    integrated_report, missing = assemble_report(
+        state,
+        (covid_analysis_result, COVID_ANALYSIS_HEADINGS),
+        (healthcare_emerging_context_section, HISTORICAL_CONTEXT_HEADINGS),
+        (closing_sections, CLOSING_HEADINGS),
+    )
     
+    timings["final_report"] = round(time.monotonic() - final_started, 3)
+    if missing:
+        timings["missing_sections"] = missing
+    record_stage("final_report", timings["final_report"], trace=trace,
+                 error=f"missing sections: {', '.join(missing)}" if missing else None)
+    timings["total"] = round(time.monotonic() - report_started, 3)
+    print(f"\n⏱️ Stage timings (seconds): {json.dumps(timings)}")
     print("\n🔍 **Final Integrated Report:**")
     
     # Save the report to a markdown file
     with open(f"{state}_integrated_healthcare_report.md", "w") as file:
         file.write(str(integrated_report))
+    # An incomplete report is returned but not cached, so the next request regenerates it
+    if not missing:
+        report_cache.put(cache_key, str(integrated_report), {"state": state, "timings": timings})
+    notify_progress(on_progress, "report", cached=False, markdown=str(integrated_report), timings=timings,
+                    trace=trace.to_dict())
     
     return integrated_report
 
@@ -0,0 +1,129 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from smolagents.models import ChatMessage
+from smolagents.monitoring import TokenUsage
+
+from agents.hospital_trends.report_cache import AGENTS_DIRECTORY
+
+# Load environment variables
+load_dotenv()
+
+# Opt-in: only models requested with `cached=True` use it, and only when this is enabled
+LLM_RESPONSE_CACHE = os.getenv("LLM_RESPONSE_CACHE", "false").lower() in ("1", "true", "yes")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(AGENTS_DIRECTORY, ".llm_cache.sqlite"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "20000"))
+# Bump to invalidate every cached response (e.g. after changing how prompts are built)
+LLM_CACHE_VERSION = "1"
+
+
+def message_to_dict(message) -> Dict[str, Any]:
+    """JSON-safe form of a ChatMessage or message dict, without the raw API response or token usage."""
+    if isinstance(message, ChatMessage):
+        data = json.loads(message.model_dump_json())
+    else:
+        data = dict(message)
+    data.pop("token_usage", None)
+    data.pop("raw", None)
+    return data
+
+
+class LLMResponseCache:
+    """
+    Persistent cache of model responses keyed by a hash of the prompt.
+
+    The key covers the cache version, model id, temperature, the full message
+    list and any other request options (stop sequences, tools, response format),
+    so a response is only replayed for exactly the same request. Cached
+    responses report zero token usage. Entries expire after `ttl_seconds` and
+    the least recently used are evicted beyond `max_entries`.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_PATH, ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+                 max_entries: int = LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+        self._init_db()
+
+    # ---- STORAGE ----
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model_id TEXT, created_at REAL, last_access REAL, payload TEXT)"
+            )
+            conn.commit()
+
+    # ---- CACHE API ----
+
+    @staticmethod
+    def make_key(model_id: str, temperature: Optional[float], messages, **options) -> str:
+        payload = json.dumps(
+            {
+                "version": LLM_CACHE_VERSION,
+                "model_id": model_id,
+                "temperature": temperature,
+                "messages": [message_to_dict(message) for message in messages],
+                "options": options,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[ChatMessage]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT created_at, payload FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and time.time() - row[0] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                row = None
+            if row is not None:
+                conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+                conn.commit()
+        with self._lock:
+            self._stats["hits" if row is not None else "misses"] += 1
+        if row is None:
+            return None
+        return ChatMessage.from_dict(json.loads(row[1]), token_usage=TokenUsage(input_tokens=0, output_tokens=0))
+
+    def put(self, key: str, model_id: str, message: ChatMessage):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, model_id, now, now, json.dumps(message_to_dict(message))),
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            conn.commit()
+        with self._lock:
+            self._stats["writes"] += 1
+            self._stats["evictions"] += max(evicted, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            hit_rate = round(self._stats["hits"] / lookups, 3) if lookups else None
+            return {"path": self.path, **self._stats, "hit_rate": hit_rate}
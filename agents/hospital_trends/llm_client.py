@@ -0,0 +1,253 @@
+import os
+import time
+import random
+import threading
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from smolagents import LiteLLMModel
+
+from agents.hospital_trends.llm_cache import LLM_RESPONSE_CACHE, LLMResponseCache
+
+# Load environment variables
+load_dotenv()
+
+# Provider limits shared by every agent in the process (0 disables a limit)
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "60"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "200000"))
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))
+# Retries on rate-limit / overload responses, with exponential backoff and full jitter
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "6"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "2"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "60"))
+# Output tokens reserved per request before the real usage is known
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv("LLM_EXPECTED_OUTPUT_TOKENS", "1500"))
+
+CHARS_PER_TOKEN = 4
+
+# HTTP statuses worth retrying: rate limited, overloaded / temporarily unavailable
+RETRYABLE_STATUS_CODES = {429, 503, 529}
+
+
+class TokenBucket:
+    """Refills `per_minute` units per minute, up to one minute's worth; `acquire` blocks until enough are available."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self.capacity = per_minute
+        self._tokens = per_minute
+        self._updated = time.monotonic()
+        self._cond = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return self.per_minute > 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def acquire(self, amount: float = 1) -> float:
+        """Takes `amount` units, waiting for the bucket to refill if needed. Returns the seconds waited."""
+        if not self.enabled:
+            return 0.0
+        amount = min(amount, self.capacity)
+        started = time.monotonic()
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return time.monotonic() - started
+                self._cond.wait((amount - self._tokens) * 60 / self.per_minute)
+
+    def adjust(self, amount: float):
+        """Corrects an earlier estimate: positive takes more units (the balance may go negative), negative returns them."""
+        if not self.enabled:
+            return
+        with self._cond:
+            self._refill()
+            self._tokens = min(self.capacity, self._tokens - amount)
+            self._cond.notify_all()
+
+
+def estimate_tokens(messages) -> int:
+    """Rough prompt size of a list of ChatMessages / message dicts (~4 characters per token)."""
+    chars = 0
+    for message in messages:
+        content = message.get("content") if isinstance(message, dict) else getattr(message, "content", None)
+        if isinstance(content, list):
+            chars += sum(len(str(part.get("text", ""))) for part in content if isinstance(part, dict))
+        elif content:
+            chars += len(str(content))
+    return chars // CHARS_PER_TOKEN
+
+
+def is_retryable_error(error: BaseException) -> bool:
+    status = getattr(error, "status_code", None)
+    if status in RETRYABLE_STATUS_CODES:
+        return True
+    name = type(error).__name__
+    return name in ("RateLimitError", "ServiceUnavailableError") or "rate limit" in str(error).lower()
+
+
+class LLMRateLimiter:
+    """
+    Admission control shared by every model in the process.
+
+    Each request waits for an in-flight slot, then for room in the requests/min
+    and tokens/min buckets (queueing callers until the provider ceiling allows
+    them through). Rate-limit and overload errors are retried with exponential
+    backoff and full jitter, without holding the slot while sleeping.
+    """
+
+    def __init__(self, requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = LLM_TOKENS_PER_MINUTE, max_in_flight: int = LLM_MAX_IN_FLIGHT,
+                 max_retries: int = LLM_MAX_RETRIES, backoff_base: float = LLM_BACKOFF_BASE_SECONDS,
+                 backoff_max: float = LLM_BACKOFF_MAX_SECONDS):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_in_flight = max(1, max_in_flight)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = threading.BoundedSemaphore(self.max_in_flight)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "failures": 0, "in_flight": 0, "queued": 0,
+                       "wait_seconds": 0.0, "input_tokens": 0, "output_tokens": 0}
+
+    def _count(self, **deltas):
+        with self._lock:
+            for key, delta in deltas.items():
+                self._stats[key] += delta
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given retry attempt (0-based)."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def call(self, fn, estimated_tokens: int):
+        """Runs `fn()` under the limits, retrying rate-limit errors. `fn` returns a ChatMessage."""
+        attempt = 0
+        while True:
+            self._count(queued=1)
+            queued_at = time.monotonic()
+            self._slots.acquire()
+            reserved = False
+            try:
+                self.requests.acquire(1)
+                self.tokens.acquire(estimated_tokens)
+                reserved = True
+                self._count(queued=-1, in_flight=1, wait_seconds=time.monotonic() - queued_at)
+                try:
+                    response = fn()
+                finally:
+                    self._count(in_flight=-1)
+            except Exception as e:
+                # A failed request used no tokens: return its reservation before retrying or raising
+                if reserved:
+                    self.tokens.adjust(-estimated_tokens)
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    self._count(failures=1)
+                    raise
+                error = e
+            else:
+                usage = getattr(response, "token_usage", None)
+                if usage is not None:
+                    self.tokens.adjust(usage.input_tokens + usage.output_tokens - estimated_tokens)
+                    self._count(input_tokens=usage.input_tokens, output_tokens=usage.output_tokens)
+                self._count(requests=1)
+                return response
+            finally:
+                self._slots.release()
+
+            delay = self.backoff(attempt)
+            attempt += 1
+            self._count(retries=1)
+            print(f"LLM request rate limited ({type(error).__name__}); retry {attempt}/{self.max_retries} in {delay:.1f}s")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests_per_minute": self.requests.per_minute,
+                "tokens_per_minute": self.tokens.per_minute,
+                "max_in_flight": self.max_in_flight,
+                **self._stats,
+                "wait_seconds": round(self._stats["wait_seconds"], 3),
+            }
+
+
+class RateLimitedLiteLLMModel(LiteLLMModel):
+    """
+    LiteLLMModel whose requests go through a shared LLMRateLimiter instead of smolagents' per-model retry.
+
+    With a `response_cache`, a request identical to an earlier one is answered
+    from the cache without calling the provider.
+    """
+
+    def __init__(self, model_id: str, limiter: "LLMRateLimiter", response_cache: Optional[LLMResponseCache] = None,
+                 **kwargs):
+        kwargs.setdefault("retry", False)
+        super().__init__(model_id=model_id, **kwargs)
+        self.limiter = limiter
+        self.response_cache = response_cache
+
+    def generate(self, messages, stop_sequences=None, response_format=None, tools_to_call_from=None, **kwargs):
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.make_key(
+                self.model_id, kwargs.get("temperature", self.kwargs.get("temperature")), messages,
+                stop_sequences=stop_sequences, response_format=response_format,
+                tools=[tool.name for tool in tools_to_call_from or []],
+                kwargs={key: value for key, value in kwargs.items() if key != "temperature"},
+            )
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        estimated = estimate_tokens(messages) + LLM_EXPECTED_OUTPUT_TOKENS
+        response = self.limiter.call(
+            lambda: super(RateLimitedLiteLLMModel, self).generate(
+                messages, stop_sequences=stop_sequences, response_format=response_format,
+                tools_to_call_from=tools_to_call_from, **kwargs
+            ),
+            estimated,
+        )
+        if cache_key is not None:
+            self.response_cache.put(cache_key, self.model_id, response)
+        return response
+
+
+# ---- PROCESS-WIDE CLIENT ----
+
+llm_limiter = LLMRateLimiter()
+llm_response_cache = LLMResponseCache() if LLM_RESPONSE_CACHE else None
+
+_models: Dict[Any, LiteLLMModel] = {}
+_models_lock = threading.Lock()
+
+
+def get_model(model_id: str, api_key: Optional[str] = None, cached: bool = False) -> LiteLLMModel:
+    """
+    The shared, rate-limited model for `model_id` (XAI_API_KEY by default). Safe to use from concurrent agents.
+
+    Args:
+        cached: Replay responses to identical prompts from the LLM response cache
+            (when LLM_RESPONSE_CACHE is enabled). Meant for agents whose inputs are static.
+    """
+    response_cache = llm_response_cache if cached else None
+    with _models_lock:
+        model = _models.get((model_id, response_cache is not None))
+        if model is None:
+            model = RateLimitedLiteLLMModel(model_id, llm_limiter, response_cache=response_cache,
+                                            api_key=api_key or os.getenv("XAI_API_KEY"))
+            _models[(model_id, response_cache is not None)] = model
+        return model
+
+
+def llm_stats() -> Dict[str, Any]:
+    return {
+        **llm_limiter.stats(),
+        "response_cache": llm_response_cache.stats() if llm_response_cache is not None else None,
+    }
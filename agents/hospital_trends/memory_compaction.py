@@ -0,0 +1,93 @@
+import os
+from typing import Optional
+
+from dotenv import load_dotenv
+from smolagents import CodeAgent
+from smolagents.memory import ActionStep
+
+from agents.hospital_trends.tool_output import CHARS_PER_TOKEN
+from agents.hospital_trends.tracing import metrics
+
+# Load environment variables
+load_dotenv()
+
+# Memory re-sent with every step, in tokens, before old steps are compacted (0 disables compaction)
+AGENT_MEMORY_TOKEN_BUDGET = int(os.getenv("AGENT_MEMORY_TOKEN_BUDGET", "12000"))
+# The most recent steps are always kept verbatim
+AGENT_MEMORY_KEEP_RECENT_STEPS = int(os.getenv("AGENT_MEMORY_KEEP_RECENT_STEPS", "2"))
+# Characters kept from each compacted observation / code block
+AGENT_MEMORY_DIGEST_CHARS = int(os.getenv("AGENT_MEMORY_DIGEST_CHARS", "400"))
+
+
+def digest(text: Optional[str], chars: int, note: str = "") -> Optional[str]:
+    """The start of `text` with a marker saying how much was dropped (unchanged if already short)."""
+    if text is None or len(text) <= chars:
+        return text
+    kept = text[:chars].rsplit(" ", 1)[0]
+    return f"{kept} ... [compacted {len(text) - len(kept)} chars{note}]"
+
+
+def step_chars(step: ActionStep) -> int:
+    """Characters a step adds to every later prompt (what ActionStep.to_messages sends)."""
+    chars = len(step.model_output or "") if isinstance(step.model_output, str) else 0
+    chars += len(step.observations or "")
+    chars += sum(len(str(call.arguments)) for call in step.tool_calls or [])
+    return chars
+
+
+class MemoryCompactor:
+    """
+    Step callback that keeps an agent's memory within a token budget.
+
+    smolagents re-sends every earlier step's code, tool calls and observations
+    with each new step, so without it prompts (and per-step latency) grow with
+    the run. Once the memory exceeds `token_budget`, the oldest steps are
+    replaced with short digests until it fits again, always keeping the
+    `keep_recent` latest steps verbatim. A CodeAgent keeps the values it
+    assigned in earlier steps as variables, so the facts stay reachable.
+    """
+
+    def __init__(self, token_budget: int = AGENT_MEMORY_TOKEN_BUDGET,
+                 keep_recent: int = AGENT_MEMORY_KEEP_RECENT_STEPS, digest_chars: int = AGENT_MEMORY_DIGEST_CHARS):
+        self.token_budget = token_budget
+        self.keep_recent = max(keep_recent, 1)
+        self.digest_chars = digest_chars
+
+    def __call__(self, memory_step, agent=None):
+        if self.token_budget <= 0 or agent is None:
+            return
+        steps = [step for step in agent.memory.steps if isinstance(step, ActionStep)]
+        # Callbacks run just before the finished step is appended to memory
+        if isinstance(memory_step, ActionStep) and all(step is not memory_step for step in steps):
+            steps.append(memory_step)
+        chars = sum(step_chars(step) for step in steps)
+        budget_chars = self.token_budget * CHARS_PER_TOKEN
+        if chars <= budget_chars:
+            return
+
+        note = "; variables it assigned are still defined" if isinstance(agent, CodeAgent) else ""
+        compacted = 0
+        for step in steps[:-self.keep_recent]:
+            if chars <= budget_chars:
+                break
+            before = step_chars(step)
+            if isinstance(step.model_output, str):
+                step.model_output = digest(step.model_output, self.digest_chars, note)
+            step.observations = digest(step.observations, self.digest_chars)
+            for call in step.tool_calls or []:
+                if isinstance(call.arguments, str):
+                    call.arguments = digest(call.arguments, self.digest_chars, note)
+            # The full prompt of an old step is never re-sent; drop it to bound memory too
+            step.model_input_messages = None
+            saved = before - step_chars(step)
+            chars -= saved
+            compacted += saved
+
+        if compacted:
+            name = getattr(agent, "name", None) or type(agent).__name__
+            metrics.inc("report_agent_memory_compactions_total", agent=name)
+            metrics.inc("report_agent_memory_tokens_compacted_total", compacted // CHARS_PER_TOKEN, agent=name)
+
+
+# Shared by the report agents: the callback keeps no per-agent state
+compact_memory = MemoryCompactor()
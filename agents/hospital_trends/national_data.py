@@ -0,0 +1,128 @@
+import os
+import time
+import threading
+from typing import Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from agents.hospital_trends.reference_store import reference_store
+from agents.hospital_trends.snowflake_async import run_queries
+from agents.hospital_trends.snowflake_queries import DELAYED_HEALTHCARE_QUERY, HEALTHCARE_VISITS_QUERY, VISIT_PANELS
+from agents.hospital_trends.tool_output import encode_tables
+
+# Load environment variables
+load_dotenv()
+
+# How long a national result is served before it is rebuilt
+NATIONAL_DATA_TTL_SECONDS = float(os.getenv("NATIONAL_DATA_TTL_SECONDS", str(24 * 3600)))
+
+
+class NationalDataset:
+    """
+    One state-invariant tool result, built once per refresh window and shared
+    by every state's report.
+
+    Concurrent callers wait for a single build instead of each querying. If a
+    rebuild fails while an earlier result is held, the earlier result keeps
+    being served (and the rebuild is retried on the next call).
+    """
+
+    def __init__(self, name: str, build: Callable[[], str], ttl_seconds: float = NATIONAL_DATA_TTL_SECONDS):
+        self.name = name
+        self.build = build
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._value: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self._stats = {"builds": 0, "build_errors": 0, "lookups": 0, "stale_serves": 0}
+
+    def _is_fresh(self) -> bool:
+        return self._loaded_at is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    def get(self) -> str:
+        self._stats["lookups"] += 1
+        if self._is_fresh():
+            return self._value
+        with self._lock:
+            if self._is_fresh():
+                return self._value
+            try:
+                value = self.build()
+            except Exception as e:
+                self._stats["build_errors"] += 1
+                if self._value is None:
+                    raise
+                print(f"Error rebuilding national dataset {self.name}, serving the previous result: {str(e)}")
+                self._stats["stale_serves"] += 1
+                return self._value
+            self._value = value
+            self._loaded_at = time.monotonic()
+            self._stats["builds"] += 1
+            return value
+
+    def invalidate(self):
+        self._loaded_at = None
+
+    def stats(self):
+        age = None if self._loaded_at is None else round(time.monotonic() - self._loaded_at, 1)
+        return {"age_seconds": age, **self._stats}
+
+
+class NationalData:
+    """Registry of the state-invariant datasets behind the report tools."""
+
+    def __init__(self):
+        self._datasets: Dict[str, NationalDataset] = {}
+
+    def register(self, name: str, build: Callable[[], str], ttl_seconds: float = NATIONAL_DATA_TTL_SECONDS):
+        self._datasets[name] = NationalDataset(name, build, ttl_seconds)
+        return self._datasets[name]
+
+    def get(self, name: str) -> str:
+        return self._datasets[name].get()
+
+    def invalidate(self, name: Optional[str] = None):
+        for dataset_name, dataset in self._datasets.items():
+            if name is None or dataset_name == name:
+                dataset.invalidate()
+
+    def stats(self):
+        return {name: dataset.stats() for name, dataset in self._datasets.items()}
+
+# ---- DATASETS ----
+
+def build_healthcare_access() -> str:
+    """
+    Emergency department and physician visits plus delayed-care counts, from the
+    national "USA" tables (local reference snapshot when available, otherwise two
+    overlapping Snowflake queries), as two CSV tables with one row per year.
+    """
+    local = reference_store.healthcare_access_frames()
+    if local is not None:
+        df_visits, df_delayed = local
+    else:
+        # Both visit panels come from one scan; the two queries run on the warehouse at the same time
+        frames = run_queries({"visits": HEALTHCARE_VISITS_QUERY, "delayed": DELAYED_HEALTHCARE_QUERY})
+        df_visits, df_delayed = frames["visits"], frames["delayed"]
+
+    # One column per panel instead of one record per panel and year
+    panels = {panel: key for key, panel in VISIT_PANELS.items()}
+    visits = (
+        df_visits[df_visits["PANEL"].isin(panels)]
+        .pivot_table(index="YEAR", columns="PANEL", values="ESTIMATE", aggfunc="first")
+        .rename(columns=panels)
+        .reindex(columns=list(VISIT_PANELS))
+        .sort_index(ascending=False)
+        .reset_index()
+    )
+    visits.columns.name = None
+    delayed = df_delayed.sort_values("YEAR", ascending=False)
+    return encode_tables({
+        "Visits per year, USA, all ages (number of visits in thousands)": visits,
+        "Delayed healthcare due to cost: survey records per year, USA": delayed,
+    }, max_rows=0)
+
+
+# Process-wide registry
+national_data = NationalData()
+national_data.register("healthcare_access", build_healthcare_access)
@@ -0,0 +1,172 @@
+import os
+import glob
+import json
+import mmap
+import time
+import threading
+from typing import Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from agents.hospital_trends.report_cache import AGENTS_DIRECTORY, file_digest
+
+# Load environment variables
+load_dotenv()
+
+# Store settings (overridable through the environment)
+PDF_STORE_DIRECTORY = os.getenv("PDF_STORE_DIRECTORY", os.path.join(AGENTS_DIRECTORY, ".pdf_text_store"))
+PDF_STORE_CHECK_INTERVAL = float(os.getenv("PDF_STORE_CHECK_INTERVAL", "30"))
+
+TEXT_FILE = "pages.bin"
+INDEX_FILE = "index.json"
+
+
+class PdfTextStore:
+    """
+    Pre-extracted page text for every PDF under agents/*/data.
+
+    All page texts live back to back in one UTF-8 file that is memory-mapped;
+    a JSON index maps each PDF to its per-page (offset, length) spans. A PDF is
+    re-extracted only when its size/mtime changes and its content hash differs.
+    """
+
+    def __init__(self, directory: str = PDF_STORE_DIRECTORY, data_root: str = AGENTS_DIRECTORY,
+                 check_interval: float = PDF_STORE_CHECK_INTERVAL):
+        self.directory = directory
+        self.data_root = data_root
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._index: Dict[str, dict] = {}
+        self._names: Dict[str, str] = {}
+        self._text: Optional[mmap.mmap] = None
+        self._last_check = float("-inf")
+
+    # ---- INGESTION ----
+
+    def _source_files(self) -> Dict[str, str]:
+        """Maps relative path -> absolute path for every PDF under agents/*/data."""
+        paths = glob.glob(os.path.join(self.data_root, "*", "data", "*.pdf"))
+        return {os.path.relpath(path, self.data_root).replace(os.sep, "/"): path for path in sorted(paths)}
+
+    def _load(self):
+        """Loads the index and maps the text file, closing the previous map. Caller holds the lock."""
+        # Readers only touch the map under the lock, so nothing still uses the old one
+        if self._text is not None:
+            self._text.close()
+            self._text = None
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        text_path = os.path.join(self.directory, TEXT_FILE)
+        try:
+            with open(index_path, "r") as file:
+                self._index = json.load(file)
+            with open(text_path, "rb") as file:
+                self._text = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(text_path) else None
+        except (FileNotFoundError, json.JSONDecodeError):
+            self._index, self._text = {}, None
+        self._names = {os.path.basename(name): name for name in self._index}
+
+    def _is_current(self, name: str, path: str) -> bool:
+        entry = self._index.get(name)
+        if entry is None:
+            return False
+        stat = os.stat(path)
+        if (entry["size"], entry["mtime_ns"]) == (stat.st_size, stat.st_mtime_ns):
+            return True
+        return entry["sha256"] == file_digest(path)
+
+    def _page_texts(self, name: str) -> List[str]:
+        entry = self._index[name]
+        return [self._text[offset:offset + length].decode("utf-8") if length else "" for offset, length in entry["pages"]]
+
+    def build(self, force: bool = False) -> Dict[str, int]:
+        """
+        Extracts any new or changed PDFs and rewrites the store.
+
+        Returns:
+            Mapping of PDF relative path -> page count for the PDFs that were (re)extracted.
+        """
+        from pypdf import PdfReader
+
+        with self._lock:
+            if self._text is None and not self._index:
+                self._load()
+            sources = self._source_files()
+            stale = [name for name, path in sources.items() if force or not self._is_current(name, path)]
+            removed = [name for name in self._index if name not in sources]
+            self._last_check = time.monotonic()
+            if not stale and not removed:
+                return {}
+
+            extracted = {}
+            all_pages = {}
+            for name, path in sources.items():
+                if name in stale:
+                    reader = PdfReader(path)
+                    all_pages[name] = [page.extract_text() or "" for page in reader.pages]
+                    extracted[name] = len(all_pages[name])
+                else:
+                    all_pages[name] = self._page_texts(name)
+
+            index = {}
+            chunks = []
+            offset = 0
+            for name, pages in all_pages.items():
+                stat = os.stat(sources[name])
+                spans = []
+                for text in pages:
+                    data = text.encode("utf-8")
+                    spans.append([offset, len(data)])
+                    chunks.append(data)
+                    offset += len(data)
+                index[name] = {
+                    "size": stat.st_size,
+                    "mtime_ns": stat.st_mtime_ns,
+                    "sha256": file_digest(sources[name]),
+                    "pages": spans,
+                }
+
+            os.makedirs(self.directory, exist_ok=True)
+            for file_name, content, mode in ((TEXT_FILE, b"".join(chunks), "wb"), (INDEX_FILE, json.dumps(index), "w")):
+                path = os.path.join(self.directory, file_name)
+                with open(path + ".tmp", mode) as file:
+                    file.write(content)
+                os.replace(path + ".tmp", path)
+
+            self._load()
+            print(f"PDF text store updated: {extracted}")
+            return extracted
+
+    def ensure_current(self):
+        """Rebuilds the store if a source PDF changed, checking at most every `check_interval` seconds."""
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.build()
+
+    # ---- LOOKUPS ----
+
+    def _resolve(self, name: str) -> Optional[str]:
+        if name in self._index:
+            return name
+        return self._names.get(os.path.basename(name))
+
+    def pages(self, name: str, max_pages: Optional[int] = None) -> Optional[List[str]]:
+        """Text of the first `max_pages` pages (all when None), or None if the PDF is unknown."""
+        self.ensure_current()
+        with self._lock:
+            key = self._resolve(name)
+            if key is None:
+                return None
+            spans = self._index[key]["pages"][:max_pages]
+            text = self._text
+            return [text[offset:offset + length].decode("utf-8") if length else "" for offset, length in spans]
+
+
+# ---- PROCESS-WIDE STORE ----
+
+pdf_store = PdfTextStore()
+
+
+if __name__ == "__main__":
+    # Ingest all PDFs ahead of time: python -m agents.hospital_trends.pdf_store
+    started = time.monotonic()
+    updated = pdf_store.build(force=True)
+    print(f"Extracted {sum(updated.values())} pages from {len(updated)} PDFs in {time.monotonic() - started:.2f}s")
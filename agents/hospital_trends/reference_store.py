@@ -0,0 +1,208 @@
+import os
+import sys
+import time
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from agents.hospital_trends.report_cache import AGENTS_DIRECTORY
+from agents.hospital_trends.snowflake_async import run_queries
+from agents.hospital_trends.snowflake_queries import (
+    DELAYED_HEALTHCARE_TABLE,
+    HEALTHCARE_VISITS_TABLE,
+    VISIT_PANELS,
+    covid_cases_by_year_query,
+    vaccine_providers_query,
+)
+from agents.hospital_trends.snowflake_results import iter_dataframes
+
+# Load environment variables
+load_dotenv()
+
+# Store settings (overridable through the environment)
+REFERENCE_STORE_PATH = os.getenv("REFERENCE_STORE_PATH", os.path.join(AGENTS_DIRECTORY, ".reference_store.sqlite"))
+REFERENCE_STORE_MAX_AGE_HOURS = float(os.getenv("REFERENCE_STORE_MAX_AGE_HOURS", str(7 * 24)))
+REFERENCE_STORE_REFRESH_INTERVAL = float(os.getenv("REFERENCE_STORE_REFRESH_INTERVAL", "3600"))
+# Serve only from the local copy (e.g. offline development against a stand-in)
+REFERENCE_STORE_OFFLINE = os.getenv("REFERENCE_STORE_OFFLINE", "false").lower() in ("1", "true", "yes")
+
+# Local table -> Snowflake query that produces it
+SNAPSHOTS = {
+    "covid_cases_by_year": covid_cases_by_year_query(None),
+    "vaccine_provider_counts": vaccine_providers_query(None),
+    "healthcare_visits": f"SELECT * FROM {HEALTHCARE_VISITS_TABLE}",
+    "delayed_healthcare": f"SELECT * FROM {DELAYED_HEALTHCARE_TABLE}",
+}
+
+_panels = ", ".join(f"'{panel}'" for panel in VISIT_PANELS.values())
+LOCAL_HEALTHCARE_VISITS_QUERY = f"""
+SELECT PANEL, UNIT, YEAR, ESTIMATE FROM healthcare_visits
+WHERE AGE = 'All ages' AND ESTIMATE > 0 AND UNIT = 'Number of visits in thousands'
+AND PANEL IN ({_panels})
+ORDER BY YEAR DESC"""
+LOCAL_DELAYED_HEALTHCARE_QUERY = "SELECT YEAR, COUNT(*) AS COUNT FROM delayed_healthcare GROUP BY YEAR"
+
+
+class ReferenceStore:
+    """
+    Local SQLite snapshot of the static Snowflake reference tables.
+
+    `sync()` pulls every table in SNAPSHOTS into a fresh database file and swaps
+    it in atomically. Lookups return None when a snapshot is missing or older
+    than `max_age_hours` (unless `offline` is set), so callers fall back to Snowflake.
+    """
+
+    def __init__(self, path: str = REFERENCE_STORE_PATH, max_age_hours: float = REFERENCE_STORE_MAX_AGE_HOURS,
+                 offline: bool = REFERENCE_STORE_OFFLINE):
+        self.path = path
+        self.max_age_seconds = max_age_hours * 3600
+        self.offline = offline
+        self._sync_lock = threading.Lock()
+        self._synced_at: Dict[str, float] = {}
+        self._synced_at_mtime: Optional[float] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+    # ---- SYNC ----
+
+    def sync(self, names: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Snapshots the reference tables from Snowflake.
+
+        Args:
+            names: Snapshot names to refresh (default: all). Others are carried over from the current store.
+
+        Returns:
+            Mapping of snapshot name -> row count.
+        """
+        names = list(names or SNAPSHOTS)
+        with self._sync_lock:
+            previous = self.synced_at()
+            tmp_path = self.path + ".tmp"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            now = time.time()
+            # Results may be consumed from several query threads; writes to the file are serialized
+            with closing(sqlite3.connect(tmp_path, check_same_thread=False)) as target:
+                write_lock = threading.Lock()
+
+                def write_snapshot(name, cursor) -> int:
+                    # Streamed batch by batch, so only one result batch of a table is in memory at a time
+                    rows = 0
+                    for batch in iter_dataframes(cursor):
+                        with write_lock:
+                            batch.to_sql(name, target, index=False, if_exists="append")
+                        rows += len(batch)
+                    return rows
+
+                # The snapshot queries are independent, so they run on the warehouse concurrently
+                counts = run_queries({name: SNAPSHOTS[name] for name in names}, consume=write_snapshot)
+
+                target.execute("CREATE TABLE snapshots (name TEXT PRIMARY KEY, synced_at REAL, row_count INTEGER)")
+                target.executemany("INSERT INTO snapshots VALUES (?, ?, ?)",
+                                   [(name, now, rows) for name, rows in counts.items()])
+                target.commit()
+
+                # Carry over snapshots that were not refreshed this time
+                carried = [name for name in previous if name not in counts]
+                if carried:
+                    target.execute("ATTACH DATABASE ? AS previous", (self.path,))
+                    for name in carried:
+                        target.execute(f"CREATE TABLE {name} AS SELECT * FROM previous.{name}")
+                        target.execute(
+                            "INSERT INTO snapshots SELECT * FROM previous.snapshots WHERE name = ?", (name,)
+                        )
+                    target.commit()
+                    target.execute("DETACH DATABASE previous")
+            os.replace(tmp_path, self.path)
+
+        print(f"Reference store synced: {counts}")
+        return counts
+
+    def synced_at(self) -> Dict[str, float]:
+        """Snapshot name -> unix time of its last sync (empty if the store doesn't exist)."""
+        try:
+            mtime = os.path.getmtime(self.path)
+        except FileNotFoundError:
+            return {}
+        # Re-read only when the file was replaced, e.g. by a sync from another process
+        if mtime != self._synced_at_mtime:
+            with closing(self._connect()) as conn:
+                self._synced_at = dict(conn.execute("SELECT name, synced_at FROM snapshots").fetchall())
+            self._synced_at_mtime = mtime
+        return self._synced_at
+
+    def stale_snapshots(self):
+        now = time.time()
+        synced_at = self.synced_at()
+        return [name for name in SNAPSHOTS if now - synced_at.get(name, 0) > self.max_age_seconds]
+
+    def is_available(self, name: str) -> bool:
+        """True when the snapshot exists and is fresh enough to serve (or the store is offline-only)."""
+        synced_at = self.synced_at().get(name)
+        if synced_at is None:
+            return False
+        return self.offline or time.time() - synced_at <= self.max_age_seconds
+
+    # ---- LOOKUPS ----
+
+    def query_dataframe(self, name: str, sql: str, params=()) -> Optional[pd.DataFrame]:
+        """Runs `sql` against the local copy, or returns None if snapshot `name` can't be served."""
+        if not self.is_available(name):
+            return None
+        with closing(self._connect()) as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    def vaccine_providers_frame(self, state_code: Optional[str] = None) -> Optional[pd.DataFrame]:
+        sql = "SELECT LOC_ADMIN_STATE, PROVIDER_COUNT FROM vaccine_provider_counts"
+        params = ()
+        if state_code:
+            sql += " WHERE LOC_ADMIN_STATE = ?"
+            params = (state_code,)
+        return self.query_dataframe("vaccine_provider_counts", sql + " ORDER BY LOC_ADMIN_STATE", params)
+
+    def healthcare_access_frames(self):
+        """(visits, delayed) DataFrames shaped like the Snowflake results, or None if not available locally."""
+        if not (self.is_available("healthcare_visits") and self.is_available("delayed_healthcare")):
+            return None
+        return (
+            self.query_dataframe("healthcare_visits", LOCAL_HEALTHCARE_VISITS_QUERY),
+            self.query_dataframe("delayed_healthcare", LOCAL_DELAYED_HEALTHCARE_QUERY),
+        )
+
+    # ---- REFRESH SCHEDULE ----
+
+    def start_refresh_scheduler(self, interval: float = REFERENCE_STORE_REFRESH_INTERVAL) -> Optional[threading.Thread]:
+        """Starts a daemon thread that re-syncs stale snapshots every `interval` seconds."""
+        if interval <= 0 or self.offline:
+            return None
+
+        def refresh_loop():
+            while True:
+                stale = self.stale_snapshots()
+                if stale:
+                    try:
+                        self.sync(stale)
+                    except Exception as e:
+                        print(f"Error refreshing reference store: {str(e)}")
+                time.sleep(interval)
+
+        thread = threading.Thread(target=refresh_loop, name="reference-store-refresh", daemon=True)
+        thread.start()
+        return thread
+
+
+# ---- PROCESS-WIDE STORE ----
+
+reference_store = ReferenceStore()
+
+
+if __name__ == "__main__":
+    # Snapshot the reference tables: python -m agents.hospital_trends.reference_store [name ...]
+    reference_store.sync(sys.argv[1:] or None)
@@ -0,0 +1,173 @@
+import os
+import json
+import glob
+import time
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Cache settings (overridable through the environment)
+REPORT_CACHE_DIRECTORY = os.getenv("REPORT_CACHE_DIRECTORY", "report_cache")
+REPORT_CACHE_TTL_SECONDS = float(os.getenv("REPORT_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "100"))
+REPORT_CACHE_MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(100 * 1024 * 1024)))
+
+# Version of the Snowflake reference data; bump when the marketplace tables are refreshed
+SNOWFLAKE_DATA_VERSION = os.getenv("SNOWFLAKE_DATA_VERSION", "1")
+
+# Root of the agents package; every agents/*/data directory feeds the reports
+AGENTS_DIRECTORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILE_PATTERNS = ("*.csv", "*.pdf")
+
+_fingerprint_lock = threading.Lock()
+_fingerprint_memo: Dict[str, tuple] = {}
+
+
+def file_digest(path: str) -> str:
+    """SHA-256 of a file, recomputed only when its size or mtime changes."""
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime_ns)
+    with _fingerprint_lock:
+        memo = _fingerprint_memo.get(path)
+        if memo and memo[0] == signature:
+            return memo[1]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+
+    with _fingerprint_lock:
+        _fingerprint_memo[path] = (signature, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def data_fingerprints() -> Dict[str, str]:
+    """Returns {relative path: content hash} for every input data file under agents/*/data."""
+    fingerprints = {}
+    for pattern in DATA_FILE_PATTERNS:
+        for path in glob.glob(os.path.join(AGENTS_DIRECTORY, "*", "data", pattern)):
+            fingerprints[os.path.relpath(path, AGENTS_DIRECTORY)] = file_digest(path)
+    fingerprints["snowflake"] = SNOWFLAKE_DATA_VERSION
+    return dict(sorted(fingerprints.items()))
+
+
+class ReportCache:
+    """
+    On-disk cache of completed integrated reports.
+
+    Entries are addressed by a hash of everything that determines a report
+    (state, prompt version, model id and input-data fingerprints), expire after
+    `ttl_seconds`, and the least recently used entries are evicted once the
+    cache exceeds `max_entries` or `max_bytes`.
+    """
+
+    def __init__(
+        self,
+        directory: str = REPORT_CACHE_DIRECTORY,
+        ttl_seconds: float = REPORT_CACHE_TTL_SECONDS,
+        max_entries: int = REPORT_CACHE_MAX_ENTRIES,
+        max_bytes: int = REPORT_CACHE_MAX_BYTES,
+    ):
+        self.directory = directory
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(**parts: Any) -> str:
+        """Content address for a report built from the given inputs."""
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        base = os.path.join(self.directory, key)
+        return base + ".md", base + ".json"
+
+    def _remove(self, key: str):
+        for path in self._paths(key):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached report, or None when missing or expired."""
+        report_path, meta_path = self._paths(key)
+        with self._lock:
+            try:
+                with open(meta_path, "r") as file:
+                    meta = json.load(file)
+                with open(report_path, "r", encoding="utf-8") as file:
+                    report = file.read()
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._stats["misses"] += 1
+                return None
+
+            if time.time() - meta["created_at"] > self.ttl_seconds:
+                self._remove(key)
+                self._stats["misses"] += 1
+                return None
+
+            # Touch the metadata file so eviction treats this entry as recently used
+            os.utime(meta_path)
+            self._stats["hits"] += 1
+            return report
+
+    def put(self, key: str, report: str, meta: Optional[Dict[str, Any]] = None):
+        """Stores a report atomically and evicts old entries if the cache is over budget."""
+        os.makedirs(self.directory, exist_ok=True)
+        report_path, meta_path = self._paths(key)
+        meta = dict(meta or {}, key=key, created_at=time.time())
+        with self._lock:
+            for path, content in ((report_path, report), (meta_path, json.dumps(meta, default=str))):
+                tmp_path = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp_path, "w", encoding="utf-8") as file:
+                    file.write(content)
+                os.replace(tmp_path, path)
+            self._stats["writes"] += 1
+            self._evict()
+
+    def _evict(self):
+        """Drops expired entries, then least recently used ones until within budget. Caller holds the lock."""
+        entries = []
+        now = time.time()
+        for meta_path in glob.glob(os.path.join(self.directory, "*.json")):
+            key = os.path.splitext(os.path.basename(meta_path))[0]
+            report_path = self._paths(key)[0]
+            try:
+                last_used = os.path.getmtime(meta_path)
+                size = os.path.getsize(report_path) + os.path.getsize(meta_path)
+                with open(meta_path, "r") as file:
+                    created_at = json.load(file)["created_at"]
+            except (OSError, json.JSONDecodeError, KeyError):
+                self._remove(key)
+                continue
+            if now - created_at > self.ttl_seconds:
+                self._remove(key)
+                self._stats["evictions"] += 1
+                continue
+            entries.append((last_used, key, size))
+
+        entries.sort()
+        total_bytes = sum(size for _, _, size in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_bytes):
+            _, key, size = entries.pop(0)
+            self._remove(key)
+            total_bytes -= size
+            self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"directory": self.directory, **self._stats}
+
+
+# Process-wide report cache
+report_cache = ReportCache()
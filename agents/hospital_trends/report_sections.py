@@ -0,0 +1,151 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# ---- REPORT STRUCTURE ----
+
+def report_title(state: str) -> str:
+    return f"# COVID-19 Impact on Healthcare in {state}: Comprehensive Analysis"
+
+# Level-2 headings of the integrated report, in order
+COVID_ANALYSIS_HEADINGS = [
+    "Executive Summary",
+    "Introduction",
+    "Pandemic Timeline and Healthcare Response",
+    "Comparative Analysis: Pre-Pandemic vs. Pandemic Healthcare",
+    "Social Determinants and COVID-19 Impact",
+    "Healthcare Provider Availability",
+    "Long-Term Implications",
+]
+HISTORICAL_CONTEXT_HEADINGS = [
+    "Historical Healthcare System Context",
+    "Emerging Challenges",
+]
+CLOSING_HEADINGS = [
+    "Recommendations",
+    "Conclusion",
+]
+REPORT_HEADINGS = COVID_ANALYSIS_HEADINGS + HISTORICAL_CONTEXT_HEADINGS + CLOSING_HEADINGS
+
+# Characters of each section quoted in the digest the closing sections are written from
+DIGEST_CHARS_PER_SECTION = 900
+
+# Level-1 and level-2 headings; level-1 ones only start a section when they name a report section
+_HEADING = re.compile(r"^(#{1,2})\s+(.+?)\s*#*\s*$")
+# Numbering models put in front of headings: "1.", "2)", "IV.", "Section 3:"
+_NUMBERING = re.compile(r"^\s*(?:section\s+)?(?:\d+|[ivx]+)[.):]\s*", re.I)
+
+# A whole output wrapped in one ```markdown / ```md / ``` fence
+_OUTER_FENCE = re.compile(r"^\s*```(?:markdown|md)?[ \t]*\n(.*)\n[ \t]*```\s*$", re.S | re.I)
+
+# ---- PARSING ----
+
+def strip_outer_fence(markdown) -> str:
+    """Unwraps an agent output that was returned as a single fenced markdown block."""
+    text = str(markdown)
+    match = _OUTER_FENCE.match(text)
+    return match.group(1) if match else text
+
+def normalize_heading(heading: str) -> str:
+    """Case-, numbering-, punctuation- and markup-insensitive form of a heading, for matching."""
+    heading = _NUMBERING.sub("", heading.strip().strip("*").strip())
+    return " ".join(re.sub(r"[^a-z0-9]+", " ", heading.lower()).split())
+
+_CANONICAL = {normalize_heading(heading): heading for heading in REPORT_HEADINGS}
+
+def split_sections(markdown, fallback: Optional[str] = None) -> Dict[str, str]:
+    """
+    Splits markdown into its level-2 sections.
+
+    Args:
+        markdown: Markdown text (one outer ```markdown fence around all of it is removed)
+        fallback: Heading that text before the first section belongs to; without
+            one, that text is dropped. Level-1 headings that are not a report
+            section (e.g. the title) are always dropped there.
+
+    Returns:
+        Mapping of heading -> section body (without the heading line), in document order.
+        Headings of the report structure are returned in their canonical spelling,
+        also when numbered or written as level-1 headings.
+    """
+    sections: Dict[str, List[str]] = {}
+    current: Optional[str] = None
+    in_fence = False
+    for line in strip_outer_fence(markdown).splitlines():
+        if line.lstrip().startswith("```"):
+            in_fence = not in_fence
+        match = None if in_fence else _HEADING.match(line)
+        if match:
+            heading = match.group(2).strip().strip("*").strip()
+            canonical = _CANONICAL.get(normalize_heading(heading))
+            if len(match.group(1)) == 2 or canonical is not None:
+                current = canonical or heading
+                sections.setdefault(current, [])
+                continue
+            if current is None:
+                continue
+        if current is None and fallback is not None and line.strip():
+            current = fallback
+            sections.setdefault(current, [])
+        if current is not None:
+            sections[current].append(line)
+    return {heading: "\n".join(lines).strip() for heading, lines in sections.items()}
+
+# ---- ASSEMBLY ----
+
+def assemble_report(state: str, *parts: Tuple[str, List[str]]) -> Tuple[str, List[str]]:
+    """
+    Stitches report parts together by heading, in REPORT_HEADINGS order.
+
+    Each part is a (markdown, headings) pair: the markdown of one stage and the
+    report headings that stage owns (e.g. COVID_ANALYSIS_HEADINGS). A part only
+    fills its own headings; a report heading it writes that belongs to another
+    stage (an agent's own "Conclusion", say) is kept as a sub-section of the
+    part's current section, so it never displaces the owning stage's section.
+    Anything that cannot be placed under a known heading (text before the first
+    section, sections with unrecognised headings and no known one before them)
+    is kept, in order, under the part's first heading instead of being dropped.
+    Sections a part adds beyond the report structure are kept after the known
+    section they followed.
+
+    Returns:
+        The report markdown, and the report headings it has no content for.
+    """
+    chunks: Dict[str, List[str]] = {}
+    for markdown, headings in parts:
+        current = headings[0]
+        for heading, body in split_sections(markdown, current).items():
+            if heading in headings:
+                current = heading
+                block = body
+            elif heading in REPORT_HEADINGS:
+                print(f"Report for {state}: keeping a stray '{heading}' section under '{current}'")
+                block = f"### {heading}\n\n{body}".strip()
+            else:
+                block = f"## {heading}\n\n{body}".strip()
+            if block:
+                chunks.setdefault(current, []).append(block)
+
+    missing = [heading for heading in REPORT_HEADINGS if not chunks.get(heading)]
+    if missing:
+        print(f"Report for {state} is missing sections: {', '.join(missing)}")
+
+    blocks = [report_title(state)]
+    for heading in REPORT_HEADINGS:
+        if chunks.get(heading):
+            blocks.append(f"## {heading}")
+            blocks.extend(chunks[heading])
+    return "\n\n".join(blocks) + "\n", missing
+
+def section_digest(*parts: Tuple[str, List[str]], chars_per_section: int = DIGEST_CHARS_PER_SECTION) -> str:
+    """
+    Compact digest of the report so far: the opening of every section, for writing
+    the closing sections. Parts are (markdown, headings) pairs, as for assemble_report.
+    """
+    lines = []
+    for markdown, headings in parts:
+        for heading, body in split_sections(markdown, headings[0]).items():
+            text = " ".join(body.split())
+            if len(text) > chars_per_section:
+                text = text[:chars_per_section].rsplit(" ", 1)[0] + " ..."
+            lines.append(f"### {heading}\n{text}")
+    return "\n\n".join(lines)
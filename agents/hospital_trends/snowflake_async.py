@@ -0,0 +1,111 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+from agents.hospital_trends.snowflake_pool import lease_connection
+from agents.hospital_trends.snowflake_results import fetch_dataframe
+
+# Load environment variables
+load_dotenv()
+
+# Polling of asynchronously submitted queries: first interval, backoff ceiling and overall timeout (seconds)
+SNOWFLAKE_POLL_INTERVAL = float(os.getenv("SNOWFLAKE_POLL_INTERVAL", "0.05"))
+SNOWFLAKE_POLL_MAX_INTERVAL = float(os.getenv("SNOWFLAKE_POLL_MAX_INTERVAL", "1"))
+# Gentle backoff: a poll landing long after a query finished is added straight to its latency
+SNOWFLAKE_POLL_BACKOFF = 1.5
+SNOWFLAKE_QUERY_TIMEOUT = float(os.getenv("SNOWFLAKE_QUERY_TIMEOUT", "600"))
+
+
+def supports_async(conn) -> bool:
+    """True for connections with Snowflake's query-id API (execute_async / get_query_status)."""
+    return hasattr(conn, "get_query_status_throw_if_error") and hasattr(conn, "is_still_running")
+
+
+def run_queries(queries: Dict[str, str], timeout: float = SNOWFLAKE_QUERY_TIMEOUT,
+                consume: Optional[Callable[[str, Any], Any]] = None) -> Dict[str, Any]:
+    """
+    Runs independent queries with their execution overlapped.
+
+    On Snowflake every query is submitted with `execute_async` from one leased
+    connection, so the warehouse runs them concurrently, and their query ids
+    are polled together (with exponential backoff) until all have finished:
+    the caller waits for the slowest query rather than the sum of them.
+    Connections without the async API run each query on its own pooled
+    connection, in a thread.
+
+    Args:
+        queries: Result name -> SQL (one statement each)
+        timeout: Seconds to wait for all queries before cancelling the rest
+        consume: Optional `consume(name, cursor)` that reads a finished query's
+            results itself, e.g. batch by batch with `iter_dataframes`, instead of
+            loading them into one DataFrame. It may be called from worker threads.
+
+    Returns:
+        Result name -> DataFrame (or what `consume` returned), in the order of `queries`.
+    """
+    if not queries:
+        return {}
+    consume = consume or _fetch
+    with lease_connection() as conn:
+        if supports_async(conn):
+            return _run_async(conn, queries, timeout, consume)
+    return _run_threaded(queries, consume)
+
+
+def _fetch(name: str, cursor) -> pd.DataFrame:
+    return fetch_dataframe(cursor)
+
+
+def _run_async(conn, queries: Dict[str, str], timeout: float, consume) -> Dict[str, Any]:
+    cursor = conn.cursor()
+    pending = {}
+    try:
+        for name, sql in queries.items():
+            cursor.execute_async(sql)
+            pending[name] = cursor.sfqid
+
+        frames = {}
+        deadline = time.monotonic() + timeout
+        interval = SNOWFLAKE_POLL_INTERVAL
+        while True:
+            for name, query_id in list(pending.items()):
+                # Raises if the query failed
+                status = conn.get_query_status_throw_if_error(query_id)
+                if not conn.is_still_running(status):
+                    cursor.get_results_from_sfqid(query_id)
+                    frames[name] = consume(name, cursor)
+                    del pending[name]
+            if not pending:
+                return {name: frames[name] for name in queries}
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Snowflake queries still running after {timeout}s: {', '.join(pending)}")
+            time.sleep(interval)
+            interval = min(interval * SNOWFLAKE_POLL_BACKOFF, SNOWFLAKE_POLL_MAX_INTERVAL)
+    finally:
+        # Don't leave abandoned queries running on the warehouse
+        for query_id in pending.values():
+            try:
+                cursor.execute(f"SELECT SYSTEM$CANCEL_QUERY('{query_id}')")
+            except Exception as e:
+                print(f"Error cancelling Snowflake query {query_id}: {str(e)}")
+        cursor.close()
+
+
+def _run_one(name: str, sql: str, consume) -> Any:
+    with lease_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+            return consume(name, cursor)
+        finally:
+            cursor.close()
+
+
+def _run_threaded(queries: Dict[str, str], consume) -> Dict[str, Any]:
+    with ThreadPoolExecutor(max_workers=len(queries), thread_name_prefix="snowflake-query") as pool:
+        futures = {name: pool.submit(_run_one, name, sql, consume) for name, sql in queries.items()}
+        return {name: future.result() for name, future in futures.items()}
@@ -0,0 +1,261 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+import snowflake.connector
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Pool settings (overridable through the environment)
+POOL_SIZE = int(os.getenv("SNOWFLAKE_POOL_SIZE", "4"))
+POOL_IDLE_TIMEOUT = float(os.getenv("SNOWFLAKE_POOL_IDLE_TIMEOUT", "300"))
+POOL_HEALTH_CHECK_INTERVAL = float(os.getenv("SNOWFLAKE_POOL_HEALTH_CHECK_INTERVAL", "60"))
+POOL_LEASE_TIMEOUT = float(os.getenv("SNOWFLAKE_POOL_LEASE_TIMEOUT", "30"))
+
+
+def get_snowflake_connection():
+    """Creates and returns a Snowflake connection."""
+    return snowflake.connector.connect(
+        user=os.getenv("SNOWFLAKE_USER"),
+        password=os.getenv("SNOWFLAKE_PASSWORD"),
+        account=os.getenv("SNOWFLAKE_ACCOUNT"),
+        database=os.getenv("SNOWFLAKE_DATABASE"),
+        warehouse=os.getenv("SNOWFLAKE_WAREHOUSE"),
+        schema=os.getenv("SNOWFLAKE_SCHEMA")
+    )
+
+
+def _is_closed(conn) -> bool:
+    """True when the underlying connection reports itself closed."""
+    is_closed = getattr(conn, "is_closed", None)
+    return bool(is_closed()) if callable(is_closed) else False
+
+
+class _PooledConnection:
+    """Book-keeping wrapper around a single pooled connection."""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.last_checked = self.created_at
+
+
+class SnowflakeConnectionPool:
+    """
+    Thread-safe pool of Snowflake connections with lease/return semantics.
+
+    Connections are created lazily up to `size`, health-checked before being
+    handed out again after `health_check_interval` seconds, and closed once they
+    sit idle for longer than `idle_timeout` seconds.
+    """
+
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        idle_timeout: float = POOL_IDLE_TIMEOUT,
+        health_check_interval: float = POOL_HEALTH_CHECK_INTERVAL,
+        lease_timeout: float = POOL_LEASE_TIMEOUT,
+        connect: Callable[[], Any] = get_snowflake_connection,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1.")
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.lease_timeout = lease_timeout
+        self._connect = connect
+        self._idle: List[_PooledConnection] = []
+        self._in_use = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "connections_created": 0,
+            "connections_closed": 0,
+            "leases": 0,
+            "lease_waits": 0,
+            "lease_wait_seconds": 0.0,
+            "lease_timeouts": 0,
+            "health_check_failures": 0,
+            "idle_evictions": 0,
+        }
+
+    # ---- INTERNAL HELPERS ----
+
+    def _close_quietly(self, connections: List[_PooledConnection]):
+        """Closes connections (a network round trip each). Caller must NOT hold the lock."""
+        for pooled in connections:
+            try:
+                pooled.conn.close()
+            except Exception as e:
+                print(f"Error closing pooled Snowflake connection: {str(e)}")
+        if connections:
+            with self._cond:
+                self._stats["connections_closed"] += len(connections)
+
+    def _evict_idle(self) -> List[_PooledConnection]:
+        """
+        Removes idle connections past the idle timeout and returns them, for the
+        caller to close once it has released the lock. Caller holds the lock.
+        """
+        now = time.monotonic()
+        keep, evicted = [], []
+        for pooled in self._idle:
+            (evicted if now - pooled.last_used > self.idle_timeout else keep).append(pooled)
+        self._idle = keep
+        self._stats["idle_evictions"] += len(evicted)
+        return evicted
+
+    def _is_healthy(self, pooled: _PooledConnection) -> bool:
+        """Runs a cheap round trip on connections that have not been checked recently."""
+        if _is_closed(pooled.conn):
+            return False
+        if time.monotonic() - pooled.last_checked < self.health_check_interval:
+            return True
+        try:
+            cursor = pooled.conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+        except Exception as e:
+            print(f"Pooled Snowflake connection failed health check: {str(e)}")
+            return False
+        pooled.last_checked = time.monotonic()
+        return True
+
+    # ---- LEASE / RETURN ----
+
+    def acquire(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """Leases a connection, creating one if the pool is below its size limit."""
+        timeout = self.lease_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited = False
+        started = time.monotonic()
+        evicted: List[_PooledConnection] = []
+
+        try:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Snowflake connection pool is closed.")
+                    evicted.extend(self._evict_idle())
+                    if self._idle:
+                        # Most recently used first, so surplus connections age out
+                        pooled = self._idle.pop()
+                        self._in_use += 1
+                        break
+                    if self._in_use < self.size:
+                        pooled = None
+                        self._in_use += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["lease_timeouts"] += 1
+                        raise TimeoutError(f"Timed out after {timeout}s waiting for a Snowflake connection.")
+                    waited = True
+                    self._cond.wait(remaining)
+
+                self._stats["leases"] += 1
+                if waited:
+                    self._stats["lease_waits"] += 1
+                    self._stats["lease_wait_seconds"] += time.monotonic() - started
+        finally:
+            # Network work happens outside the lock
+            self._close_quietly(evicted)
+
+        try:
+            if pooled is not None and not self._is_healthy(pooled):
+                with self._cond:
+                    self._stats["health_check_failures"] += 1
+                self._close_quietly([pooled])
+                pooled = None
+            if pooled is None:
+                pooled = _PooledConnection(self._connect())
+                with self._cond:
+                    self._stats["connections_created"] += 1
+        except Exception:
+            with self._cond:
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False):
+        """Returns a leased connection to the pool, or closes it when `discard` is set."""
+        with self._cond:
+            self._in_use -= 1
+            close = discard or self._closed or _is_closed(pooled.conn)
+            if not close:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._cond.notify()
+        if close:
+            self._close_quietly([pooled])
+
+    @contextmanager
+    def lease(self, timeout: Optional[float] = None):
+        """Context manager yielding a raw Snowflake connection borrowed from the pool."""
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled.conn
+        except Exception:
+            # Force a health check before the connection is handed out again
+            pooled.last_checked = float("-inf")
+            raise
+        finally:
+            self.release(pooled)
+
+    # ---- LIFECYCLE / METRICS ----
+
+    def close(self):
+        """Closes all idle connections and refuses new leases."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        self._close_quietly(idle)
+
+    def metrics(self) -> Dict[str, Any]:
+        """Returns a snapshot of the pool configuration and counters."""
+        with self._cond:
+            return {
+                "size": self.size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "idle_timeout": self.idle_timeout,
+                "health_check_interval": self.health_check_interval,
+                **self._stats,
+            }
+
+
+# ---- PROCESS-WIDE POOL ----
+
+_pool: Optional[SnowflakeConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> SnowflakeConnectionPool:
+    """Returns the process-wide Snowflake connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = SnowflakeConnectionPool()
+    return _pool
+
+
+def lease_connection(timeout: Optional[float] = None):
+    """Borrows a connection from the process-wide pool (use as a context manager)."""
+    return get_pool().lease(timeout)
+
+
+def pool_metrics() -> Dict[str, Any]:
+    """Returns metrics for the process-wide pool."""
+    return get_pool().metrics()
@@ -0,0 +1,79 @@
+from typing import Optional
+
+# ---- SNOWFLAKE TABLES ----
+
+NYT_CASES_TABLE = "COVID19_GLOBAL_DATA_ATLAS.HLS_COVID19_USA.COVID19_USA_CASES_DEATHS_BY_STATE_DAILY_NYT"
+VACCINE_PROVIDERS_TABLE = "COVID19_GLOBAL_DATA_ATLAS.HLS_COVID19_USA.COVID_19_US_VACCINATING_PROVIDER_LOCATIONS"
+HEALTHCARE_VISITS_TABLE = 'DIVERSITY_EQUITY_AND_INCLUSION__ACCESS_TO_HEALTHCARE.DEI_HEALTHCARE."Healthcare Visits by Age/Sex/Race - USA"'
+DELAYED_HEALTHCARE_TABLE = 'DIVERSITY_EQUITY_AND_INCLUSION__ACCESS_TO_HEALTHCARE.DEI_HEALTHCARE."Delayed Healthcare Due to Cost - USA"'
+
+US_STATES = {
+    "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
+    "Colorado": "CO", "Connecticut": "CT", "Delaware": "DE", "Florida": "FL", "Georgia": "GA",
+    "Hawaii": "HI", "Idaho": "ID", "Illinois": "IL", "Indiana": "IN", "Iowa": "IA",
+    "Kansas": "KS", "Kentucky": "KY", "Louisiana": "LA", "Maine": "ME", "Maryland": "MD",
+    "Massachusetts": "MA", "Michigan": "MI", "Minnesota": "MN", "Mississippi": "MS",
+    "Missouri": "MO", "Montana": "MT", "Nebraska": "NE", "Nevada": "NV", "New Hampshire": "NH",
+    "New Jersey": "NJ", "New Mexico": "NM", "New York": "NY", "North Carolina": "NC",
+    "North Dakota": "ND", "Ohio": "OH", "Oklahoma": "OK", "Oregon": "OR", "Pennsylvania": "PA",
+    "Rhode Island": "RI", "South Carolina": "SC", "South Dakota": "SD", "Tennessee": "TN",
+    "Texas": "TX", "Utah": "UT", "Vermont": "VT", "Virginia": "VA", "Washington": "WA",
+    "West Virginia": "WV", "Wisconsin": "WI", "Wyoming": "WY"
+}
+
+# ---- QUERIES ----
+
+def covid_cases_by_year_query(state: Optional[str] = None) -> str:
+    """Year-over-year COVID cases and deaths (yearly MAX of the cumulative counts, differenced per state)."""
+    base_query = f"""
+    WITH state_agg AS
+    (
+        SELECT
+            EXTRACT(YEAR FROM date) AS year,
+            state,
+            MAX(cases) AS cases,
+            MAX(deaths) AS deaths
+        FROM {NYT_CASES_TABLE}
+    """
+
+    if state:
+        base_query += f"    WHERE state='{state}'\n"
+
+    return base_query + """
+        GROUP BY EXTRACT(YEAR FROM date), state
+        ORDER BY state, year)
+    SELECT year, state,
+        cases - LAG(cases, 1, 0) OVER (PARTITION BY state ORDER BY state, year) as cases,
+        deaths - LAG(deaths, 1, 0) OVER (PARTITION BY state ORDER BY state, year) as deaths
+    FROM state_agg;
+    """
+
+def vaccine_providers_query(state_code: Optional[str] = None) -> str:
+    """Vaccination provider location counts per state."""
+    query = f"""
+    SELECT LOC_ADMIN_STATE, COUNT(*) AS PROVIDER_COUNT
+    FROM {VACCINE_PROVIDERS_TABLE}
+    """
+
+    if state_code:
+        query += f" WHERE LOC_ADMIN_STATE = '{state_code}'"
+
+    return query + " GROUP BY LOC_ADMIN_STATE ORDER BY LOC_ADMIN_STATE"
+
+# Result key -> PANEL value in the "Healthcare Visits by Age/Sex/Race - USA" table
+VISIT_PANELS = {
+    "emergency_dept_visits": "Hospital emergency departments",
+    "physician_visits": "Physician offices",
+}
+
+HEALTHCARE_VISITS_QUERY = f"""
+SELECT PANEL, UNIT, YEAR, ESTIMATE
+FROM {HEALTHCARE_VISITS_TABLE}
+WHERE AGE = 'All ages' AND ESTIMATE > 0 AND UNIT = 'Number of visits in thousands'
+AND PANEL IN ('Hospital emergency departments', 'Physician offices')
+ORDER BY YEAR DESC"""
+
+DELAYED_HEALTHCARE_QUERY = f"""
+SELECT YEAR, COUNT(*) AS COUNT
+FROM {DELAYED_HEALTHCARE_TABLE}
+GROUP BY YEAR"""
@@ -0,0 +1,47 @@
+from typing import Iterator
+
+import pandas as pd
+from snowflake.connector.errors import NotSupportedError
+
+# Rows per batch when the cursor can't hand back Arrow batches
+FALLBACK_BATCH_SIZE = 10000
+
+
+def iter_dataframes(cursor) -> Iterator[pd.DataFrame]:
+    """
+    Yields the cursor's result set as DataFrames, one per result batch.
+
+    Snowflake result chunks arrive as Arrow record batches, so
+    `fetch_pandas_batches` converts them column-wise without building a Python
+    tuple per row. Cursors without Arrow results (e.g. SHOW commands, local
+    stand-ins) fall back to `fetchmany`.
+    """
+    fetch_batches = getattr(cursor, "fetch_pandas_batches", None)
+    if fetch_batches is not None:
+        try:
+            yielded = False
+            for batch in fetch_batches():
+                yielded = True
+                yield batch
+            if yielded:
+                return
+        except NotSupportedError:
+            pass
+        else:
+            # Empty result sets yield no batches; still expose the column names
+            yield pd.DataFrame(columns=[desc[0] for desc in cursor.description])
+            return
+
+    columns = [desc[0] for desc in cursor.description]
+    while True:
+        rows = cursor.fetchmany(FALLBACK_BATCH_SIZE)
+        yield pd.DataFrame(rows, columns=columns)
+        if len(rows) < FALLBACK_BATCH_SIZE:
+            return
+
+
+def fetch_dataframe(cursor) -> pd.DataFrame:
+    """Fetches the whole result set into one DataFrame."""
+    batches = list(iter_dataframes(cursor))
+    return batches[0] if len(batches) == 1 else pd.concat(batches, ignore_index=True)
+
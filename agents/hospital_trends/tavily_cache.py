@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from dotenv import load_dotenv
+
+from agents.hospital_trends.report_cache import AGENTS_DIRECTORY
+
+# Load environment variables
+load_dotenv()
+
+# Cache settings (overridable through the environment)
+TAVILY_CACHE_PATH = os.getenv("TAVILY_CACHE_PATH", os.path.join(AGENTS_DIRECTORY, ".tavily_cache.sqlite"))
+TAVILY_CACHE_TTL_SECONDS = float(os.getenv("TAVILY_CACHE_TTL_SECONDS", str(24 * 3600)))
+TAVILY_CACHE_MAX_ENTRIES = int(os.getenv("TAVILY_CACHE_MAX_ENTRIES", "5000"))
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return " ".join(str(query).lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Canonical form of a URL: lowercase scheme/host, no fragment, no trailing slash."""
+    parts = urlsplit(str(url).strip())
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, parts.query, ""))
+
+
+class TavilyCache:
+    """
+    Persistent cache in front of a TavilyClient's `search` and `extract` calls.
+
+    Responses are stored in SQLite, keyed by the normalized query (plus search
+    options) or by the normalized URL for extracts, expire after `ttl_seconds`,
+    and the least recently used entries are evicted beyond `max_entries`.
+    Concurrent requests for the same key share a single API call.
+    """
+
+    def __init__(self, client, path: str = TAVILY_CACHE_PATH, ttl_seconds: float = TAVILY_CACHE_TTL_SECONDS,
+                 max_entries: int = TAVILY_CACHE_MAX_ENTRIES):
+        self.client = client
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+        self._init_db()
+
+    # ---- STORAGE ----
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, created_at REAL, last_access REAL, payload TEXT)"
+            )
+            conn.commit()
+
+    def _read(self, key: str) -> Optional[Any]:
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT created_at, payload FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if time.time() - row[0] > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            return json.loads(row[1])
+
+    def _write(self, entries: Dict[str, Any]):
+        now = time.time()
+        with closing(self._connect()) as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                [(key, now, now, json.dumps(value)) for key, value in entries.items()],
+            )
+            # Expired entries first, then least recently used beyond the size bound
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,))
+            evicted = conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            conn.commit()
+        with self._lock:
+            self._stats["evictions"] += max(evicted, 0)
+
+    # ---- COALESCING ----
+
+    def _claim(self, keys: List[str]):
+        """Splits keys into (futures we must fill, futures owned by other callers)."""
+        owned, waiting = {}, {}
+        with self._lock:
+            for key in keys:
+                if key in self._in_flight:
+                    waiting[key] = self._in_flight[key]
+                    self._stats["coalesced"] += 1
+                else:
+                    owned[key] = self._in_flight[key] = Future()
+        return owned, waiting
+
+    def _settle(self, owned: Dict[str, Future], values: Dict[str, Any], error: Optional[BaseException] = None):
+        with self._lock:
+            for key in owned:
+                del self._in_flight[key]
+        for key, future in owned.items():
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(values.get(key))
+
+    def _cached_call(self, keys: List[str], fetch: Callable[[List[str]], Dict[str, Any]]) -> Dict[str, Any]:
+        """Returns {key: value} for every key, calling `fetch` only for keys that are neither cached nor in flight."""
+        values = {}
+        missing = []
+        for key in keys:
+            value = self._read(key)
+            if value is None:
+                missing.append(key)
+            else:
+                values[key] = value
+        with self._lock:
+            self._stats["hits"] += len(values)
+            self._stats["misses"] += len(missing)
+        if not missing:
+            return values
+
+        owned, waiting = self._claim(missing)
+        if owned:
+            try:
+                fetched = fetch(list(owned))
+            except BaseException as e:
+                self._settle(owned, {}, e)
+                raise
+            cacheable = {key: value for key, value in fetched.items() if value is not None}
+            if cacheable:
+                self._write(cacheable)
+            self._settle(owned, fetched)
+            values.update(fetched)
+        for key, future in waiting.items():
+            values[key] = future.result()
+        return values
+
+    # ---- TAVILY API ----
+
+    def search(self, query: str, **kwargs) -> Any:
+        """Cached `client.search(query=..., **kwargs)`."""
+        key = "search:" + json.dumps([normalize_query(query), kwargs], sort_keys=True)
+        return self._cached_call([key], lambda keys: {key: self.client.search(query=query, **kwargs)})[key]
+
+    def extract(self, urls) -> Dict[str, Any]:
+        """
+        Cached `client.extract(urls=...)`, cached per URL.
+
+        Only URLs that are not cached (or being fetched by another caller) are sent
+        to Tavily, in one request. Returns a response shaped like Tavily's:
+        {"results": [...], "failed_results": [...]}, in the order requested.
+        """
+        urls = [urls] if isinstance(urls, str) else list(urls)
+        keys = {url: "extract:" + normalize_url(url) for url in urls}
+
+        def fetch(missing_keys):
+            wanted = [url for url in urls if keys[url] in missing_keys]
+            response = self.client.extract(urls=wanted)
+            by_url = {normalize_url(result["url"]): result for result in response.get("results", [])}
+            return {key: by_url.get(key[len("extract:"):]) for key in missing_keys}
+
+        values = self._cached_call(list(dict.fromkeys(keys.values())), fetch)
+        results, failed = [], []
+        for url in urls:
+            result = values.get(keys[url])
+            if result is None:
+                failed.append({"url": url, "error": "No content extracted"})
+            else:
+                results.append(result)
+        return {"results": results, "failed_results": failed}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"path": self.path, **self._stats}
@@ -0,0 +1,113 @@
+import io
+import os
+import re
+import csv
+import math
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import pandas as pd
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Tool outputs are pasted into the agent's context on every later step, so they are
+# encoded compactly: CSV tables, rounded numbers, and capped rows / snippets / pages
+TOOL_OUTPUT_DECIMALS = int(os.getenv("TOOL_OUTPUT_DECIMALS", "2"))
+TOOL_OUTPUT_MAX_ROWS = int(os.getenv("TOOL_OUTPUT_MAX_ROWS", "60"))
+WEB_SEARCH_MAX_RESULTS = int(os.getenv("WEB_SEARCH_MAX_RESULTS", "5"))
+WEB_SEARCH_SNIPPET_TOKENS = int(os.getenv("WEB_SEARCH_SNIPPET_TOKENS", "200"))
+
+CHARS_PER_TOKEN = 4
+
+# ---- TEXT ----
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cuts text to roughly `max_tokens` tokens, at a word boundary."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rsplit(" ", 1)[0] + " ... [truncated]"
+
+
+# Table-of-contents style dot leaders (". . . . ." / ".....") from PDF tables
+_DOT_LEADERS = re.compile(r"(?:\s*\.){4,}\s*")
+_SPACES = re.compile(r"[ \t ]+")
+
+
+@lru_cache(maxsize=32)
+def compact_text(text: str) -> str:
+    """
+    Whitespace-normalized text: runs of spaces and dot leaders collapse to one
+    space, and blank lines are dropped. Every word and figure is kept.
+    """
+    lines = (_SPACES.sub(" ", _DOT_LEADERS.sub(" ", line)).strip() for line in text.splitlines())
+    return "\n".join(line for line in lines if line)
+
+# ---- TABLES ----
+
+def format_number(value: Any, decimals: int = TOOL_OUTPUT_DECIMALS) -> str:
+    """Numbers without float noise: integers as-is, floats rounded with trailing zeros dropped."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    if isinstance(value, bool):
+        return str(value).lower()
+    if isinstance(value, float):
+        if value.is_integer():
+            return str(int(value))
+        text = f"{value:.{decimals}f}".rstrip("0").rstrip(".")
+        return "0" if text == "-0" else text
+    return str(value)
+
+
+def encode_table(frame: pd.DataFrame, title: Optional[str] = None, decimals: int = TOOL_OUTPUT_DECIMALS,
+                 max_rows: int = TOOL_OUTPUT_MAX_ROWS, hoist_constants: bool = True,
+                 overflow_hint: str = "") -> str:
+    """
+    CSV-style text for a DataFrame (index excluded), for tool outputs.
+
+    Column names appear once instead of on every record, numbers are rounded to
+    `decimals`, and (with more than one row) columns holding a single value are
+    hoisted into a "# COLUMN: value" line above the table. Rows beyond `max_rows`
+    are dropped with a note saying how many, followed by `overflow_hint`.
+    """
+    lines = [f"# {title}"] if title else []
+    if hoist_constants and len(frame) > 1:
+        constant = [column for column in frame.columns if frame[column].nunique(dropna=False) == 1]
+        if len(constant) < len(frame.columns):
+            for column in constant:
+                lines.append(f"# {column}: {format_number(frame[column].iloc[0], decimals)}")
+            frame = frame.drop(columns=constant)
+
+    omitted = max(len(frame) - max_rows, 0) if max_rows > 0 else 0
+    if omitted:
+        frame = frame.iloc[:max_rows]
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(frame.columns)
+    for row in frame.itertuples(index=False, name=None):
+        writer.writerow(format_number(value, decimals) for value in row)
+    lines.append(buffer.getvalue().rstrip("\n"))
+    if omitted:
+        lines.append(f"# ... {omitted} more rows omitted. {overflow_hint}".rstrip())
+    return "\n".join(lines)
+
+
+def encode_tables(tables: Dict[str, pd.DataFrame], **options) -> str:
+    """Several titled tables, separated by blank lines."""
+    return "\n\n".join(encode_table(frame, title=title, **options) for title, frame in tables.items())
+
+# ---- WEB SEARCH ----
+
+def encode_search_results(response: Any, max_results: int = WEB_SEARCH_MAX_RESULTS,
+                          snippet_tokens: int = WEB_SEARCH_SNIPPET_TOKENS) -> str:
+    """A Tavily search response as a short list of titled, truncated snippets with their URLs."""
+    if isinstance(response, str):
+        return truncate_to_tokens(response, max_results * snippet_tokens)
+    lines = []
+    for result in (response or {}).get("results", [])[:max_results]:
+        snippet = truncate_to_tokens(_SPACES.sub(" ", result.get("content") or "").strip(), snippet_tokens)
+        lines.append(f"- {result.get('title', '')} ({result.get('url', '')}): {snippet}")
+    return "\n".join(lines) if lines else "No search results."
@@ -0,0 +1,224 @@
+import time
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from smolagents import Tool
+from smolagents.memory import ActionStep
+
+# ---- PROCESS-WIDE METRICS ----
+
+# Metric name -> help text, in exposition order
+METRICS = {
+    "report_generations_total": "Integrated reports requested, by report cache outcome",
+    "report_stage_runs_total": "Report stages run",
+    "report_stage_errors_total": "Report stages that failed or timed out",
+    "report_stage_seconds_total": "Wall time spent in report stages",
+    "report_tool_calls_total": "Tool calls made by report agents",
+    "report_tool_errors_total": "Tool calls that raised an exception",
+    "report_tool_seconds_total": "Wall time spent in tool calls",
+    "report_agent_runs_total": "Agent runs",
+    "report_agent_errors_total": "Agent runs that raised an exception",
+    "report_agent_seconds_total": "Wall time spent in agent runs",
+    "report_agent_steps_total": "Agent steps taken",
+    "report_agent_tool_calls_total": "Tool calls requested by agents",
+    "report_llm_input_tokens_total": "LLM input tokens, by agent",
+    "report_llm_output_tokens_total": "LLM output tokens, by agent",
+    "report_agent_memory_compactions_total": "Agent steps after which old memory was compacted",
+    "report_agent_memory_tokens_compacted_total": "Tokens removed from agent memory by compaction",
+}
+
+
+class MetricsRegistry:
+    """Thread-safe labelled counters, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: Dict[str, Dict[Tuple[Tuple[str, str], ...], float]] = {name: {} for name in METRICS}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted((label, str(label_value)) for label, label_value in labels.items()))
+        with self._lock:
+            self._values[name][key] = self._values[name].get(key, 0) + value
+
+    def render(self, gauges: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
+        """
+        Prometheus text for every counter, plus `gauges`: prefix -> stats dict, whose
+        numeric values are exported as `<prefix>_<key>` gauges (e.g. cache hit counts).
+        """
+        lines = []
+        with self._lock:
+            for name, help_text in METRICS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for labels, value in sorted(self._values[name].items()):
+                    lines.append(f"{name}{format_labels(labels)} {format_value(value)}")
+        for prefix, stats in (gauges or {}).items():
+            for key, value in flatten_stats(stats):
+                name = f"{prefix}_{key}"
+                lines.append(f"# TYPE {name} gauge")
+                lines.append(f"{name} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def format_labels(labels) -> str:
+    if not labels:
+        return ""
+
+    def escape(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{label}="{escape(value)}"' for label, value in labels) + "}"
+
+
+def format_value(value) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def flatten_stats(stats, prefix: str = ""):
+    """(key, value) pairs for every numeric value in a nested stats dict."""
+    for key, value in (stats or {}).items():
+        name = f"{prefix}{key}"
+        if isinstance(value, bool):
+            yield name, int(value)
+        elif isinstance(value, (int, float)):
+            yield name, value
+        elif isinstance(value, dict):
+            yield from flatten_stats(value, f"{name}_")
+
+
+metrics = MetricsRegistry()
+
+# ---- PER-REPORT TRACE ----
+
+class ReportTrace:
+    """Spans recorded while generating one report, summarized per stage, tool and agent."""
+
+    def __init__(self, state: Optional[str] = None):
+        self.state = state
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._spans: List[Dict[str, Any]] = []
+
+    def record(self, kind: str, name: str, seconds: float, stage: Optional[str] = None,
+               error: Optional[str] = None, **fields):
+        span = {"kind": kind, "name": name, "stage": stage, "start": round(time.monotonic() - self.started - seconds, 3),
+                "seconds": round(seconds, 3), "error": error, **fields}
+        with self._lock:
+            self._spans.append(span)
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span["start"])
+        stages, tools, agents = {}, {}, {}
+        for span in spans:
+            if span["kind"] == "stage":
+                stages[span["name"]] = {"seconds": span["seconds"], "error": span["error"]}
+            elif span["kind"] == "tool":
+                entry = tools.setdefault(span["name"], {"calls": 0, "errors": 0, "seconds": 0.0})
+                entry["calls"] += 1
+                entry["errors"] += span["error"] is not None
+                entry["seconds"] = round(entry["seconds"] + span["seconds"], 3)
+            elif span["kind"] == "agent":
+                entry = agents.setdefault(span["name"], {
+                    "runs": 0, "errors": 0, "seconds": 0.0, "steps": 0, "tool_calls": 0,
+                    "input_tokens": 0, "output_tokens": 0,
+                })
+                entry["runs"] += 1
+                entry["errors"] += span["error"] is not None
+                entry["seconds"] = round(entry["seconds"] + span["seconds"], 3)
+                for key in ("steps", "tool_calls", "input_tokens", "output_tokens"):
+                    entry[key] += span.get(key, 0)
+        return {
+            "state": self.state,
+            "seconds": round(time.monotonic() - self.started, 3),
+            "stages": stages,
+            "tools": tools,
+            "agents": agents,
+            "input_tokens": sum(agent["input_tokens"] for agent in agents.values()),
+            "output_tokens": sum(agent["output_tokens"] for agent in agents.values()),
+            "spans": spans,
+        }
+
+# ---- RECORDING ----
+
+def record_stage(name: str, seconds: float, error: Optional[str] = None, trace: Optional[ReportTrace] = None):
+    metrics.inc("report_stage_runs_total", stage=name)
+    metrics.inc("report_stage_seconds_total", seconds, stage=name)
+    if error is not None:
+        metrics.inc("report_stage_errors_total", stage=name)
+    if trace is not None:
+        trace.record("stage", name, seconds, stage=name, error=error)
+
+
+def record_agent(name: str, seconds: float, stage: Optional[str] = None, error: Optional[str] = None,
+                 trace: Optional[ReportTrace] = None, steps: int = 0, tool_calls: int = 0,
+                 input_tokens: int = 0, output_tokens: int = 0):
+    metrics.inc("report_agent_runs_total", agent=name)
+    metrics.inc("report_agent_seconds_total", seconds, agent=name)
+    metrics.inc("report_agent_steps_total", steps, agent=name)
+    metrics.inc("report_agent_tool_calls_total", tool_calls, agent=name)
+    metrics.inc("report_llm_input_tokens_total", input_tokens, agent=name)
+    metrics.inc("report_llm_output_tokens_total", output_tokens, agent=name)
+    if error is not None:
+        metrics.inc("report_agent_errors_total", agent=name)
+    if trace is not None:
+        trace.record("agent", name, seconds, stage=stage, error=error, steps=steps, tool_calls=tool_calls,
+                     input_tokens=input_tokens, output_tokens=output_tokens)
+
+
+class TracedTool(Tool):
+    """A tool that delegates to `tool` and records each call's wall time and errors."""
+
+    skip_forward_signature_validation = True
+
+    def __init__(self, tool: Tool, trace: Optional[ReportTrace] = None, stage: Optional[str] = None):
+        self.name = tool.name
+        self.description = tool.description
+        self.inputs = tool.inputs
+        self.output_type = tool.output_type
+        self.wrapped = tool
+        self.trace = trace
+        self.stage = stage
+        super().__init__()
+
+    def forward(self, *args, **kwargs):
+        started = time.monotonic()
+        error = None
+        try:
+            return self.wrapped(*args, **kwargs)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            seconds = time.monotonic() - started
+            metrics.inc("report_tool_calls_total", tool=self.name)
+            metrics.inc("report_tool_seconds_total", seconds, tool=self.name)
+            if error is not None:
+                metrics.inc("report_tool_errors_total", tool=self.name)
+            if self.trace is not None:
+                self.trace.record("tool", self.name, seconds, stage=self.stage, error=error)
+
+
+def instrument_agent(agent, name: str, trace: Optional[ReportTrace] = None, stage: Optional[str] = None):
+    """Wraps `agent.run` (also used when a manager calls it as a managed agent) to record each run."""
+    run = agent.run
+
+    def traced_run(*args, **kwargs):
+        started = time.monotonic()
+        error = None
+        try:
+            return run(*args, **kwargs)
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            usage = agent.monitor.get_total_token_counts()
+            steps = [step for step in agent.memory.steps if isinstance(step, ActionStep)]
+            record_agent(
+                name, time.monotonic() - started, stage=stage, error=error, trace=trace,
+                steps=len(steps), tool_calls=sum(len(step.tool_calls or []) for step in steps),
+                input_tokens=usage.input_tokens, output_tokens=usage.output_tokens,
+            )
+
+    agent.run = traced_run
+    return agent
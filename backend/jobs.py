@@ -0,0 +1,118 @@
+import os
+import time
+import uuid
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+# Job settings (overridable through the environment)
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "2"))
+JOB_RETENTION_SECONDS = float(os.getenv("JOB_RETENTION_SECONDS", "3600"))
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+
+class Job:
+    """A single report request tracked by the job queue."""
+
+    def __init__(self, params: Dict[str, Any]):
+        self.id = uuid.uuid4().hex
+        self.params = params
+        self.status = QUEUED
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        # Set once the job is queued; done when it has finished (or was cancelled)
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status view of the job, without the (potentially large) result."""
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            # Callables (e.g. a progress callback) are not part of the status view
+            "params": {key: value for key, value in self.params.items() if not callable(value)},
+            "error": self.error,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    In-process job queue that runs `run_fn(**params)` on a bounded worker pool.
+
+    Submitting returns immediately; callers poll `get()` for status and read
+    `job.result` once the job has finished. Finished jobs are kept for
+    `retention_seconds` and then dropped.
+    """
+
+    def __init__(
+        self,
+        run_fn: Callable[..., Any],
+        max_workers: int = REPORT_WORKERS,
+        retention_seconds: float = JOB_RETENTION_SECONDS,
+    ):
+        self.run_fn = run_fn
+        self.max_workers = max_workers
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def _purge_expired(self):
+        """Drops finished jobs past their retention window. Caller holds the lock."""
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    def _run(self, job: Job):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = self.run_fn(**job.params)
+            status = SUCCEEDED
+        except Exception as e:
+            print(f"Job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            status = FAILED
+        # finished_at is set before the status, so a finished job always has one
+        job.finished_at = time.time()
+        job.status = status
+
+    def submit(self, **params) -> Job:
+        """Queues a job and returns it without waiting for it to run."""
+        job = Job(params)
+        with self._lock:
+            self._purge_expired()
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, SUCCEEDED: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return {"max_workers": self.max_workers, **counts}
+
+    def shutdown(self, wait: bool = False):
+        self._executor.shutdown(wait=wait, cancel_futures=True)
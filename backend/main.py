@@ -1,8 +1,24 @@
 import os
+import json
+import queue
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import List, Union
 
-from agents.hospital_trends.integrated import generate_integrated_report
+from agents.hospital_trends.batch import BATCH_CONCURRENCY, read_manifest, resolve_states, run_batch
+from agents.hospital_trends.covid_cases import covid_yearly_table
+from agents.hospital_trends.hospital_beds import bed_trend_table
+from agents.hospital_trends.llm_client import llm_stats
+from agents.hospital_trends.integrated import generate_integrated_report, tavily_cache
+from agents.hospital_trends.national_data import national_data
+from agents.hospital_trends.pdf_store import pdf_store
+from agents.hospital_trends.reference_store import reference_store
+from agents.hospital_trends.report_cache import report_cache
+from agents.hospital_trends.snowflake_pool import pool_metrics
+from agents.hospital_trends.tracing import ReportTrace, metrics
+from backend.jobs import FAILED, JobQueue
 
 from dotenv import load_dotenv
 load_dotenv()
@@ -11,8 +27,42 @@ from openai import OpenAI
 
 class NVDIARequest(BaseModel):
     state: str
+    refresh: bool = False
+
+
+class BatchRequest(BaseModel):
+    states: Union[str, List[str]] = "all"
+    concurrency: int = BATCH_CONCURRENCY
+    refresh: bool = False
     
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load local datasets once at startup so tool calls are pure lookups
+    bed_trend_table.load()
+    pdf_store.ensure_current()
+    # Keep the local snapshot of the Snowflake reference tables fresh in the background
+    reference_store.start_refresh_scheduler()
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+
+def run_report(state: str, refresh: bool = False, on_progress=None):
+    """Generates a report (or serves it from cache) and returns it with its per-stage timings and trace."""
+    timings = {}
+    trace = ReportTrace(state)
+    report = generate_integrated_report(state, timings=timings, refresh=refresh, on_progress=on_progress, trace=trace)
+    return {
+        "answer": report,
+        "timings": timings,
+        "trace": trace.to_dict()
+    }
+
+# Reports run in the background so long generations don't hold a request open
+report_jobs = JobQueue(run_report)
+# One batch at a time: batches resume from, and write to, the same manifest
+batch_jobs = JobQueue(run_batch, max_workers=1)
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 
@@ -23,18 +73,149 @@ def read_root():
     return {"message": "Agentic Research Tool"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return metrics.render({
+        "llm_client": llm_stats(),
+        "tavily_cache": tavily_cache.stats(),
+        "report_cache": report_cache.stats(),
+        "snowflake_pool": pool_metrics(),
+        "report_jobs": report_jobs.stats(),
+        "national_data": national_data.stats(),
+    })
+
+
+@app.get("/snowflake_pool")
+def snowflake_pool_metrics():
+    return pool_metrics()
+
+
+@app.get("/llm_client")
+def llm_client_stats():
+    return llm_stats()
+
+
+@app.get("/reference_store")
+def reference_store_status():
+    return {
+        "synced_at": reference_store.synced_at(),
+        "stale": reference_store.stale_snapshots(),
+        "offline": reference_store.offline,
+        "covid_yearly_table": covid_yearly_table.stats(),
+        "national_data": national_data.stats()
+    }
+
+
+@app.get("/tavily_cache")
+def tavily_cache_stats():
+    return tavily_cache.stats()
+
+
+@app.get("/report_cache")
+def report_cache_stats():
+    return report_cache.stats()
+
+
 @app.post("/generate_research")
 def query_nvdia_documents(request: NVDIARequest):
     try:
         state = request.state
         print("state:", state)
 
-        report = generate_integrated_report(state)
-        print("report generated")
-        answer = report
+        result = run_report(state, refresh=request.refresh)
+        print("report generated in", result["timings"].get("total"), "seconds")
         
-        return {
-            "answer": answer
-        }
+        return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error answering question: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error answering question: {str(e)}")
+
+
+# Seconds between SSE keep-alive comments while a stage is still running
+SSE_KEEPALIVE_SECONDS = 15
+
+
+def format_sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+def stream_report_events(state: str, refresh: bool):
+    """
+    Queues the report on the report job pool, like /generate_research/jobs, and
+    yields its progress as Server-Sent Events.
+    """
+    events = queue.Queue()
+    job = report_jobs.submit(state=state, refresh=refresh, on_progress=events.put)
+    job.future.add_done_callback(lambda _: events.put(None))
+    yield format_sse("queued", {"event": "queued", "job_id": job.id})
+    while True:
+        try:
+            event = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+        except queue.Empty:
+            yield ": keepalive\n\n"
+            continue
+        if event is None:
+            if job.status == FAILED:
+                yield format_sse("error", {"event": "error", "detail": f"Error answering question: {job.error}"})
+            return
+        yield format_sse(event["event"], event)
+
+
+@app.get("/generate_research/stream")
+def stream_research(state: str, refresh: bool = False):
+    print("streaming state:", state)
+    return StreamingResponse(
+        stream_report_events(state, refresh),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/generate_research/jobs", status_code=202)
+def submit_research_job(request: NVDIARequest):
+    job = report_jobs.submit(state=request.state, refresh=request.refresh)
+    print("queued job:", job.id, "state:", request.state)
+    return job.to_dict()
+
+
+@app.get("/jobs")
+def job_queue_stats():
+    return report_jobs.stats()
+
+
+@app.get("/jobs/{job_id}")
+def get_research_job(job_id: str):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_dict()
+
+
+@app.get("/jobs/{job_id}/result")
+def get_research_job_result(job_id: str):
+    job = report_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job.status == FAILED:
+        raise HTTPException(status_code=500, detail=f"Error answering question: {job.error}")
+    if not job.finished:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is still {job.status}")
+    return job.result
+
+
+@app.post("/generate_research/batch", status_code=202)
+def submit_batch_job(request: BatchRequest):
+    try:
+        states = resolve_states(request.states)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = batch_jobs.submit(states=states, concurrency=request.concurrency, refresh=request.refresh)
+    print("queued batch:", job.id, "states:", len(states))
+    return job.to_dict()
+
+
+@app.get("/batch/{job_id}")
+def get_batch_job(job_id: str):
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch '{job_id}' not found")
+    return {**job.to_dict(), "manifest": read_manifest()}
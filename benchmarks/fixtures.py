@@ -0,0 +1,111 @@
+import datetime
+from typing import Iterable, Optional
+
+import duckdb
+import numpy as np
+import pandas as pd
+
+from agents.hospital_trends.snowflake_queries import (
+    DELAYED_HEALTHCARE_TABLE,
+    HEALTHCARE_VISITS_TABLE,
+    NYT_CASES_TABLE,
+    US_STATES,
+    VACCINE_PROVIDERS_TABLE,
+)
+
+VISIT_PANELS = ["Hospital emergency departments", "Physician offices", "Hospital outpatient departments", "Home visits"]
+VISIT_UNITS = ["Number of visits in thousands", "Visits per 100 persons"]
+AGE_GROUPS = ["All ages", "Under 18 years", "18-44 years", "45-64 years", "65 years and over"]
+
+
+# ---- FIXTURE TABLES ----
+
+def nyt_cases(rng, states: Iterable[str], start=datetime.date(2020, 1, 21), end=datetime.date(2023, 3, 23)) -> pd.DataFrame:
+    """Daily cumulative cases and deaths per state, shaped like the NYT table."""
+    dates = pd.date_range(start, end, freq="D")
+    frames = []
+    for index, state in enumerate(states):
+        daily_cases = rng.poisson(rng.uniform(200, 20000), len(dates))
+        daily_deaths = rng.binomial(daily_cases, 0.012)
+        frames.append(pd.DataFrame({
+            "DATE": dates.date,
+            "STATE": state,
+            "FIPS": index + 1,
+            "CASES": np.cumsum(daily_cases),
+            "DEATHS": np.cumsum(daily_deaths),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def vaccine_providers(rng, states: Iterable[str]) -> pd.DataFrame:
+    """One row per vaccinating provider location."""
+    codes = [US_STATES[state] for state in states]
+    counts = rng.integers(200, 3000, len(codes))
+    state_codes = np.repeat(codes, counts)
+    return pd.DataFrame({
+        "PROVIDER_LOCATION_GUID": [f"loc-{i:07d}" for i in range(len(state_codes))],
+        "LOC_ADMIN_STATE": state_codes,
+        "LOC_ADMIN_ZIP": rng.integers(10000, 99999, len(state_codes)).astype(str),
+        "IN_STOCK": rng.random(len(state_codes)) > 0.2,
+    })
+
+
+def healthcare_visits(rng, years=range(2000, 2020)) -> pd.DataFrame:
+    """National visit estimates by panel, unit, age group and year."""
+    rows = []
+    for panel in VISIT_PANELS:
+        for unit in VISIT_UNITS:
+            for age in AGE_GROUPS:
+                base = rng.uniform(1000, 900000) if unit == VISIT_UNITS[0] else rng.uniform(10, 400)
+                for year in years:
+                    rows.append({
+                        "PANEL": panel, "UNIT": unit, "AGE": age, "SEX": "Both sexes",
+                        "YEAR": str(year), "ESTIMATE": round(base * rng.uniform(0.9, 1.1), 1),
+                    })
+    return pd.DataFrame(rows)
+
+
+def delayed_healthcare(rng, years=range(2000, 2020)) -> pd.DataFrame:
+    """Survey rows of people who delayed care due to cost."""
+    rows = []
+    for year in years:
+        for _ in range(int(rng.integers(20, 60))):
+            rows.append({
+                "YEAR": str(year),
+                "GROUP": str(rng.choice(AGE_GROUPS)),
+                "ESTIMATE": round(float(rng.uniform(2, 20)), 1),
+            })
+    return pd.DataFrame(rows)
+
+
+# ---- DATABASE ----
+
+def build_fixture_database(seed: int = 0, states: Optional[Iterable[str]] = None) -> duckdb.DuckDBPyConnection:
+    """
+    An in-memory DuckDB database holding every Snowflake table the tools query.
+
+    Each Snowflake database is an attached DuckDB database with the same
+    schema and table names, so the production queries run unchanged. The data
+    is synthetic, generated from `seed`.
+    """
+    rng = np.random.default_rng(seed)
+    states = list(states or US_STATES)
+    tables = {
+        NYT_CASES_TABLE: nyt_cases(rng, states),
+        VACCINE_PROVIDERS_TABLE: vaccine_providers(rng, states),
+        HEALTHCARE_VISITS_TABLE: healthcare_visits(rng),
+        DELAYED_HEALTHCARE_TABLE: delayed_healthcare(rng),
+    }
+
+    db = duckdb.connect(":memory:")
+    databases = {table.split(".")[0] for table in tables}
+    schemas = {".".join(table.split(".")[:2]) for table in tables}
+    for database in sorted(databases):
+        db.execute(f"ATTACH ':memory:' AS {database}")
+    for schema in sorted(schemas):
+        db.execute(f"CREATE SCHEMA {schema}")
+    for table, frame in tables.items():
+        db.register("fixture", frame)
+        db.execute(f"CREATE TABLE {table} AS SELECT * FROM fixture")
+        db.unregister("fixture")
+    return db
@@ -0,0 +1,284 @@
+"""
+Offline benchmark of the report pipeline.
+
+Runs the real agents, tools and report assembly against local stand-ins
+(DuckDB fixture tables for Snowflake, scripted LLM responses, canned Tavily
+results) with configurable injected latencies, so runs are reproducible and
+comparable across commits:
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+"""
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import datetime
+import tempfile
+import statistics
+import subprocess
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+# Offline: use litellm's bundled model cost map instead of fetching it at import
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm  # noqa: E402,F401  (import before any worker thread touches the model client)
+
+from benchmarks.fixtures import build_fixture_database  # noqa: E402
+from benchmarks.stand_ins import install_stand_ins  # noqa: E402
+
+SCENARIOS = ["tools", "covid_analysis", "covid_sections", "historical", "report", "throughput"]
+
+# ---- MEASUREMENT ----
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = (len(ordered) - 1) * q
+    lower = int(index)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (index - lower)
+
+
+def summarize(seconds: List[float], **extra) -> Dict[str, Any]:
+    return {
+        "runs": len(seconds),
+        "p50_seconds": round(percentile(seconds, 0.5), 4),
+        "p95_seconds": round(percentile(seconds, 0.95), 4),
+        "mean_seconds": round(statistics.fmean(seconds), 4) if seconds else 0.0,
+        **extra,
+    }
+
+
+def timed(fn: Callable[[], Any], iterations: int) -> List[float]:
+    seconds = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        fn()
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def llm_usage(stand_ins, before=None) -> Dict[str, int]:
+    from agents.hospital_trends.llm_client import llm_limiter
+
+    stats = llm_limiter.stats()
+    usage = {
+        "llm_calls": stand_ins["llm"].calls,
+        "input_tokens": stats["input_tokens"],
+        "output_tokens": stats["output_tokens"],
+        "web_calls": sum(stand_ins["tavily"].calls.values()),
+    }
+    if before is not None:
+        usage = {key: value - before[key] for key, value in usage.items()}
+    return usage
+
+
+def peak_traced_memory(fn: Callable[[], Any]) -> float:
+    """Peak Python heap allocated while running `fn`, in MiB (a separate pass: tracing slows everything down)."""
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 2 ** 20, 2)
+    finally:
+        tracemalloc.stop()
+
+# ---- SCENARIOS ----
+
+def bench_tools(args, stand_ins) -> Dict[str, Any]:
+    from agents.hospital_trends import integrated
+
+    state = args.states[0]
+    calls = {
+        "query_covid_cases_by_year": lambda: integrated.query_covid_cases_by_year(state=state),
+        "query_vaccine_providers": lambda: integrated.query_vaccine_providers(state=state),
+        "query_healthcare_access": lambda: integrated.query_healthcare_access(state=state),
+        "analyze_hospital_beds": lambda: integrated.analyze_hospital_beds(state=state),
+        "analyze_emergency_visits": lambda: integrated.analyze_emergency_visits(),
+        "extract_hospital_utilization": lambda: integrated.extract_hospital_utilization(),
+        "extract_emergingchallenges_pdf": lambda: integrated.extract_emergingchallenges_pdf(),
+        "web_search": lambda: integrated.web_search(query=f"{state} hospital capacity COVID-19"),
+        "fetch_web_content": lambda: integrated.fetch_web_content(
+            url=[f"https://example.org/{state}/{i}" for i in range(3)]
+        ),
+    }
+    results = {}
+    for name, call in calls.items():
+        output = call()
+        seconds = timed(call, args.iterations)
+        results[name] = summarize(seconds, output_chars=len(str(output)))
+    return results
+
+
+def bench_stage(fn: Callable[[str], Any]):
+    def run(args, stand_ins) -> Dict[str, Any]:
+        state = args.states[0]
+        before = llm_usage(stand_ins)
+        seconds = timed(lambda: fn(state), args.iterations)
+        usage = llm_usage(stand_ins, before)
+        per_run = {key: round(value / max(args.iterations, 1), 1) for key, value in usage.items()}
+        return summarize(seconds, **per_run)
+    return run
+
+
+def generate_report(state: str) -> str:
+    from agents.hospital_trends.integrated import generate_integrated_report
+    from agents.hospital_trends.tracing import ReportTrace
+
+    return generate_integrated_report(state, refresh=True, trace=ReportTrace(state))
+
+
+def bench_report(args, stand_ins) -> Dict[str, Any]:
+    result = bench_stage(generate_report)(args, stand_ins)
+    if not args.skip_memory:
+        result["tracemalloc_peak_mib"] = peak_traced_memory(lambda: generate_report(args.states[0]))
+    return result
+
+
+def bench_throughput(args, stand_ins) -> Dict[str, Any]:
+    states = [args.states[i % len(args.states)] for i in range(args.concurrency * args.iterations)]
+    before = llm_usage(stand_ins)
+    started = time.perf_counter()
+    seconds = []
+
+    def run_one(state):
+        run_started = time.perf_counter()
+        generate_report(state)
+        seconds.append(time.perf_counter() - run_started)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(run_one, states))
+    elapsed = time.perf_counter() - started
+    return summarize(
+        seconds,
+        concurrency=args.concurrency,
+        wall_seconds=round(elapsed, 3),
+        reports_per_minute=round(len(states) * 60 / elapsed, 2),
+        **llm_usage(stand_ins, before),
+    )
+
+
+def scenario_runners() -> Dict[str, Callable]:
+    from agents.hospital_trends import integrated
+
+    return {
+        "tools": bench_tools,
+        "covid_analysis": bench_stage(integrated.run_covid_analysis),
+        "covid_sections": bench_stage(integrated.run_covid_sections),
+        "historical": bench_stage(integrated.run_historical_context),
+        "report": bench_report,
+        "throughput": bench_throughput,
+    }
+
+# ---- REPORTING ----
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def print_results(results: Dict[str, Any], baseline: Dict[str, Any] = None):
+    current = flatten(results)
+    previous = flatten(baseline or {})
+    width = max((len(name) for name in current), default=10)
+    for name, value in current.items():
+        line = f"{name:<{width}}  {value:>12}"
+        if name in previous:
+            delta = value - previous[name]
+            pct = f" ({delta / previous[name]:+.1%})" if previous[name] else ""
+            line += f"  was {previous[name]:>12}  {delta:+.4g}{pct}"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report pipeline against local stand-ins.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS),
+                        help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--states", default="Illinois,California,Texas", help="Comma-separated states to report on")
+    parser.add_argument("--iterations", type=int, default=3, help="Timed runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=3, help="Concurrent reports in the throughput scenario")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds per LLM call")
+    parser.add_argument("--tavily-latency", type=float, default=0.05, help="Seconds per Tavily call")
+    parser.add_argument("--sql-latency", type=float, default=0.02, help="Seconds per Snowflake query")
+    parser.add_argument("--requests-per-minute", type=float, default=0, help="LLM request limit (0: unlimited)")
+    parser.add_argument("--tokens-per-minute", type=float, default=0, help="LLM token limit (0: unlimited)")
+    parser.add_argument("--web-cache-ttl", type=float, default=0,
+                        help="Tavily cache TTL in seconds (0: every web call goes to the stand-in)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the fixture data")
+    parser.add_argument("--skip-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--workdir", default=None, help="Directory for caches and report files (default: a temp dir)")
+    parser.add_argument("--output", default=None, help="Write the results as JSON to this file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON from an earlier --output to diff against")
+    args = parser.parse_args(argv)
+    args.scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    args.states = [state.strip() for state in args.states.split(",") if state.strip()]
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"Unknown scenarios: {', '.join(unknown)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    output = os.path.abspath(args.output) if args.output else None
+    compare = os.path.abspath(args.compare) if args.compare else None
+    workdir = os.path.abspath(args.workdir or tempfile.mkdtemp(prefix="report_bench_"))
+
+    started = time.perf_counter()
+    db = build_fixture_database(seed=args.seed)
+    print(f"Fixture database built in {time.perf_counter() - started:.2f}s; working in {workdir}")
+    stand_ins = install_stand_ins(
+        workdir, db, llm_latency=args.llm_latency, tavily_latency=args.tavily_latency, sql_latency=args.sql_latency,
+        requests_per_minute=args.requests_per_minute, tokens_per_minute=args.tokens_per_minute,
+        web_cache_ttl=args.web_cache_ttl,
+    )
+
+    runners = scenario_runners()
+    results = {}
+    for name in args.scenarios:
+        print(f"Running {name}...")
+        results[name] = runners[name](args, stand_ins)
+    results["max_rss_mib"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+    config = {key: value for key, value in vars(args).items() if key not in ("output", "compare", "workdir")}
+    run = {"commit": git_commit(), "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+           "config": config, "results": results}
+
+    baseline = None
+    if compare:
+        with open(compare) as f:
+            baseline = json.load(f)
+        print(f"\nComparing against {baseline.get('commit')} ({baseline.get('timestamp')})")
+        if baseline.get("config") != config:
+            print("Warning: the baseline was run with a different configuration.")
+    print()
+    print_results(results, baseline["results"] if baseline else None)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"\nResults written to {output}")
+    return run
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
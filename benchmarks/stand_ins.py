@@ -0,0 +1,367 @@
+import os
+import re
+import json
+import time
+import uuid
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import SimpleNamespace
+from typing import Any, Dict, Optional
+
+import pandas as pd
+
+from agents.hospital_trends.snowflake_queries import US_STATES
+
+CHARS_PER_TOKEN = 4
+# Heading of the prefetched tool results appended to agent tasks (integrated.PREFETCH_NOTE)
+PREFETCH_MARKER = "PREFETCHED DATA:"
+
+
+def _sleep(latency: float):
+    if latency > 0:
+        time.sleep(latency)
+
+
+# ---- SNOWFLAKE: DUCKDB CONNECTION ----
+
+class DuckDBCursor:
+    """
+    Snowflake-cursor stand-in over a DuckDB connection.
+
+    Models what production code calls: `execute`, `execute_async` / `sfqid` /
+    `get_results_from_sfqid` (through `run_queries`), `fetch_pandas_batches`,
+    `fetchmany` / `fetchone` and `description`. Column names are upper-cased,
+    as Snowflake does for unquoted identifiers. Each query sleeps `latency`
+    seconds to stand in for the round trip and warehouse time.
+    """
+
+    def __init__(self, connection: "DuckDBConnection", batch_rows: int = 50000):
+        self._connection = connection
+        self.batch_rows = batch_rows
+        self.sfqid: Optional[str] = None
+        self._frame = pd.DataFrame()
+        self._offset = 0
+
+    def execute(self, sql: str, **kwargs):
+        self._set_result(self._connection.run(sql))
+        return self
+
+    def execute_async(self, sql: str, **kwargs) -> Dict[str, Any]:
+        self.sfqid = self._connection.submit(sql)
+        return {"queryId": self.sfqid}
+
+    def get_results_from_sfqid(self, sfqid: str):
+        self._set_result(self._connection.result(sfqid))
+
+    def _set_result(self, frame: pd.DataFrame):
+        self._frame = frame
+        self._offset = 0
+
+    @property
+    def description(self):
+        return [(column, None, None, None, None, None, True) for column in self._frame.columns]
+
+    def fetch_pandas_batches(self):
+        frame = self._frame
+        for start in range(self._offset, len(frame), self.batch_rows):
+            yield frame.iloc[start:start + self.batch_rows].reset_index(drop=True)
+        self._offset = len(frame)
+
+    def fetchmany(self, size: int):
+        frame = self._frame
+        rows = list(frame.iloc[self._offset:self._offset + size].itertuples(index=False, name=None))
+        self._offset += len(rows)
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def close(self):
+        pass
+
+
+class DuckDBConnection:
+    """
+    Snowflake-connection stand-in handed out by the connection pool.
+
+    Queries submitted with `execute_async` run on a background thread (each on
+    its own DuckDB cursor) and are tracked by query id, like Snowflake's
+    `get_query_status_throw_if_error` / `is_still_running` API.
+    """
+
+    RUNNING = "RUNNING"
+    SUCCESS = "SUCCESS"
+
+    def __init__(self, db, latency: float = 0.0, max_async: int = 8):
+        self._db = db
+        self.latency = latency
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers=max_async, thread_name_prefix="duckdb-async")
+        self._queries: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def run(self, sql: str) -> pd.DataFrame:
+        _sleep(self.latency)
+        cursor = self._db.cursor()
+        try:
+            frame = cursor.execute(sql).fetch_df()
+        finally:
+            cursor.close()
+        frame.columns = [str(column).upper() for column in frame.columns]
+        return frame
+
+    def submit(self, sql: str) -> str:
+        query_id = uuid.uuid4().hex
+        with self._lock:
+            self._queries[query_id] = self._executor.submit(self.run, sql)
+        return query_id
+
+    def get_query_status_throw_if_error(self, query_id: str) -> str:
+        future = self._queries[query_id]
+        if not future.done():
+            return self.RUNNING
+        future.result()
+        return self.SUCCESS
+
+    @classmethod
+    def is_still_running(cls, status: str) -> bool:
+        return status == cls.RUNNING
+
+    def result(self, query_id: str) -> pd.DataFrame:
+        with self._lock:
+            future = self._queries.pop(query_id)
+        return future.result()
+
+    def cursor(self):
+        return DuckDBCursor(self)
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        self._closed = True
+        self._executor.shutdown(wait=False)
+
+
+# ---- TAVILY ----
+
+class CannedTavily:
+    """TavilyClient stand-in: deterministic search results and page contents, after `latency` seconds."""
+
+    def __init__(self, latency: float = 0.0, results_per_search: int = 5, page_words: int = 3000):
+        self.latency = latency
+        self.results_per_search = results_per_search
+        self.page_words = page_words
+        self._lock = threading.Lock()
+        self.calls = {"search": 0, "extract": 0}
+
+    def _count(self, kind: str):
+        with self._lock:
+            self.calls[kind] += 1
+
+    @staticmethod
+    def _slug(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+
+    def search(self, query: str, **kwargs) -> Dict[str, Any]:
+        self._count("search")
+        _sleep(self.latency)
+        slug = self._slug(query)
+        return {
+            "query": query,
+            "results": [
+                {
+                    "title": f"{query} - source {i + 1}",
+                    "url": f"https://example.org/{slug}/{i + 1}",
+                    "content": f"Summary {i + 1} for {query}. " + filler_text(120, seed=f"{slug}{i}"),
+                    "score": round(1 - i * 0.1, 2),
+                }
+                for i in range(self.results_per_search)
+            ],
+        }
+
+    def extract(self, urls, **kwargs) -> Dict[str, Any]:
+        self._count("extract")
+        _sleep(self.latency)
+        urls = [urls] if isinstance(urls, str) else list(urls)
+        return {
+            "results": [{"url": url, "raw_content": filler_text(self.page_words, seed=url)} for url in urls],
+            "failed_results": [],
+        }
+
+
+# ---- LLM ----
+
+_WORDS = ("hospital capacity admissions emergency physician visits pandemic access staffing policy rural urban "
+          "trend increase decline percent rate population coverage provider vaccination outcomes").split()
+
+
+def filler_text(words: int, seed: str = "") -> str:
+    """Deterministic prose-like text of about `words` words, sprinkled with figures."""
+    offset = int(hashlib.sha1(seed.encode("utf-8")).hexdigest(), 16)
+    out = []
+    for i in range(words):
+        if i % 17 == 16:
+            out.append(f"{(offset + i * 37) % 1000 / 10:.1f}%")
+        else:
+            out.append(_WORDS[(offset + i * 7) % len(_WORDS)])
+    return " ".join(out)
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    content = message.get("content")
+    if isinstance(content, list):
+        return "\n".join(str(part.get("text", "")) for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+_HEADING = re.compile(r'^\s*"?(##\s+[^"\n\]\[]+?)"?\s*$', re.M)
+_CODE_FUNCTION = re.compile(r"^def (\w+)\(([^)]*)\)", re.M)
+
+
+class ScriptedCompletions:
+    """
+    Stand-in for the `litellm` module behind LiteLLMModel: `completion(**kwargs)`
+    returns a scripted response after `latency` seconds.
+
+    - Tool-calling agents call their first tool once, then give a final answer.
+    - Code agents call every tool / managed agent listed in their system prompt
+      once (first argument only), then give a final answer. When the task
+      already carries prefetched tool results, they answer straight away.
+    - Final answers (and direct, agent-less calls) contain every "## Heading" the
+      task asked for, each followed by `paragraphs` paragraphs of filler, so the
+      report assembly downstream sees realistic sections.
+    """
+
+    def __init__(self, latency: float = 0.0, paragraphs: int = 3, words_per_paragraph: int = 120):
+        self.latency = latency
+        self.paragraphs = paragraphs
+        self.words_per_paragraph = words_per_paragraph
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _markdown(self, task: str) -> str:
+        headings = list(dict.fromkeys(match.strip() for match in _HEADING.findall(task)))
+        seed = self._state(task)
+        body = "\n\n".join(filler_text(self.words_per_paragraph, seed=f"{seed}{i}") for i in range(self.paragraphs))
+        if not headings:
+            return body
+        return "\n\n".join(f"{heading}\n\n{body}" for heading in headings)
+
+    @staticmethod
+    def _state(task: str) -> str:
+        for state in US_STATES:
+            if state in task:
+                return state
+        return "United States"
+
+    def _argument(self, parameters: str, task: str) -> str:
+        first = parameters.split(",")[0]
+        if not first.strip():
+            return ""
+        if "array" in first or "list" in first:
+            return repr([f"https://example.org/{self._state(task)}/{i}" for i in range(2)])
+        return repr(self._state(task) if "task" not in first else f"Analyze this for {self._state(task)}")
+
+    def completion(self, messages, tools=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        _sleep(self.latency)
+        system = next((message_text(m) for m in messages if m.get("role") == "system"), "")
+        task = next((message_text(m) for m in messages if m.get("role") == "user"), "")
+        turns = sum(1 for m in messages if m.get("role") == "assistant")
+        tool_calls = None
+
+        if tools:
+            names = [tool["function"]["name"] for tool in tools]
+            others = [tool for tool in tools if tool["function"]["name"] != "final_answer"]
+            if turns == 0 and others:
+                function = others[0]["function"]
+                params = function.get("parameters", {}).get("properties", {})
+                arguments = {
+                    name: ([f"https://example.org/{self._state(task)}/0"] if spec.get("type") == "array"
+                           else self._state(task))
+                    for name, spec in list(params.items())[:1]
+                }
+                tool_calls = [{"id": f"call_{self.calls}", "type": "function",
+                               "function": {"name": function["name"], "arguments": json.dumps(arguments)}}]
+            elif "final_answer" in names:
+                tool_calls = [{"id": f"call_{self.calls}", "type": "function",
+                               "function": {"name": "final_answer",
+                                            "arguments": json.dumps({"answer": self._markdown(task)})}}]
+            content = None
+        elif system:
+            functions = [(name, params) for name, params in _CODE_FUNCTION.findall(system) if name != "final_answer"]
+            if turns == 0 and functions and PREFETCH_MARKER not in task:
+                code = "\n".join(f"print({name}({self._argument(params, task)}))" for name, params in functions)
+            else:
+                code = f"final_answer({self._markdown(task)!r})"
+            content = f"Thought: Working through the task.\n<code>\n{code}\n</code>"
+        else:
+            content = self._markdown(task)
+
+        prompt_chars = sum(len(message_text(m)) for m in messages)
+        completion_chars = len(content or "") + len(json.dumps(tool_calls or []))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls))],
+            usage=SimpleNamespace(prompt_tokens=prompt_chars // CHARS_PER_TOKEN,
+                                  completion_tokens=completion_chars // CHARS_PER_TOKEN),
+            model_dump=lambda: {},
+        )
+
+
+# ---- INSTALLATION ----
+
+def install_stand_ins(workdir: str, db, llm_latency: float = 0.0, tavily_latency: float = 0.0,
+                      sql_latency: float = 0.0, requests_per_minute: float = 0, tokens_per_minute: float = 0,
+                      web_cache_ttl: float = 0) -> Dict[str, Any]:
+    """
+    Points the report pipeline's process-wide clients at the local stand-ins.
+
+    - LLM: every shared model calls ScriptedCompletions (the rate limiter stays
+      in the path, with the given limits; 0 disables a limit). The LLM response
+      cache is turned off.
+    - Snowflake: the connection pool hands out DuckDB connections over `db`.
+    - Tavily: a fresh TavilyCache in `workdir` over CannedTavily (`web_cache_ttl=0`
+      makes every call a miss).
+    - The reference store points at a missing file, so queries go to "Snowflake";
+      in-memory tables and the report cache start empty.
+
+    Report files are written under `workdir`. Returns the stand-ins so callers
+    can read their call counts.
+    """
+    from agents.hospital_trends import (
+        covid_cases, integrated, llm_client, national_data, reference_store, report_cache, snowflake_pool
+    )
+    from agents.hospital_trends.tavily_cache import TavilyCache
+
+    os.makedirs(workdir, exist_ok=True)
+    completions = ScriptedCompletions(latency=llm_latency)
+    tavily = CannedTavily(latency=tavily_latency)
+
+    llm_client.RateLimitedLiteLLMModel.create_client = lambda self: completions
+    with llm_client._models_lock:
+        llm_client._models.clear()
+    llm_client.llm_limiter.requests = llm_client.TokenBucket(requests_per_minute)
+    llm_client.llm_limiter.tokens = llm_client.TokenBucket(tokens_per_minute)
+    llm_client.llm_response_cache = None
+
+    snowflake_pool._pool = snowflake_pool.SnowflakeConnectionPool(
+        connect=lambda: DuckDBConnection(db, latency=sql_latency)
+    )
+    integrated.tavily_cache = TavilyCache(tavily, path=os.path.join(workdir, "tavily_cache.sqlite"),
+                                          ttl_seconds=web_cache_ttl)
+
+    store = reference_store.reference_store
+    store.path = os.path.join(workdir, "missing_reference_store.sqlite")
+    store.offline = False
+    store._synced_at = {}
+    store._synced_at_mtime = None
+    covid_cases.covid_yearly_table._loaded_at = None
+    national_data.national_data.invalidate()
+    report_cache.report_cache.directory = os.path.join(workdir, "report_cache")
+
+    os.chdir(workdir)
+    return {"llm": completions, "tavily": tavily}
@@ -7,6 +7,80 @@ load_dotenv()
 
 # API_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
 API_URL = "https://fastapi-service-vclcprawja-ue.a.run.app"
+POLL_INTERVAL_SECONDS = 5
+STAGE_TITLES = {
+    "covid_analysis": "COVID-19 Analysis",
+    "historical_context": "Historical Context",
+    "final_report": "Final Report",
+}
+
+
+def iter_sse(response):
+    """Yields (event, data) pairs from a streaming text/event-stream response."""
+    event, data = None, []
+    for line in response.iter_lines(decode_unicode=True):
+        if line == "":
+            if event and data:
+                yield event, json.loads("\n".join(data))
+            event, data = None, []
+        elif line.startswith(":"):
+            continue  # keep-alive comment
+        elif line.startswith("event:"):
+            event = line[len("event:"):].strip()
+        elif line.startswith("data:"):
+            data.append(line[len("data:"):].strip())
+
+
+def stream_report(state, refresh):
+    """Renders stage results as they finish, then the final report."""
+    status = st.empty()
+    with requests.get(f"{API_URL}/generate_research/stream", params={"state": state, "refresh": refresh},
+                      stream=True, timeout=(10, None)) as response:
+        if response.status_code != 200:
+            st.error(f"Error: {response.text}")
+            return
+        for event, data in iter_sse(response):
+            if event == "queued":
+                status.info("Queued, waiting for a report worker...")
+            elif event == "stage_started":
+                status.info(f"Running: {STAGE_TITLES.get(data['stage'], data['stage'])}...")
+            elif event == "stage_completed":
+                with st.expander(f"{STAGE_TITLES.get(data['stage'], data['stage'])} ({data['seconds']}s)"):
+                    st.markdown(data.get("markdown") or "")
+            elif event == "report":
+                status.empty()
+                st.markdown(data["markdown"])
+                return
+            elif event == "error":
+                status.empty()
+                st.error(f"Error: {data['detail']}")
+                return
+    status.empty()
+    st.error("Error: the report stream ended before the report was ready")
+
+
+def poll_report(state, refresh):
+    # Submit a background job and poll it, so long reports don't hit request timeouts
+    response = requests.post(f"{API_URL}/generate_research/jobs", json={"state": state, "refresh": refresh})
+    if response.status_code != 202:
+        st.error(f"Error: {response.text}")
+        return
+    job_id = response.json()["job_id"]
+    status = response.json()["status"]
+    while status not in ("succeeded", "failed"):
+        time.sleep(POLL_INTERVAL_SECONDS)
+        response = requests.get(f"{API_URL}/jobs/{job_id}")
+        if response.status_code != 200:
+            st.error(f"Error: {response.text}")
+            return
+        status = response.json()["status"]
+
+    response = requests.get(f"{API_URL}/jobs/{job_id}/result")
+    if response.status_code == 200:
+        answer = response.json()["answer"]
+        st.markdown(answer)
+    else:
+        st.error(f"Error: {response.text}")
 
 # def trigger_all_agents():
 #     exit()
@@ -24,16 +98,16 @@ def main():
     "Utah", "Vermont", "Virginia", "Washington", "West Virginia", "Wisconsin", "Wyoming"
 ]
     state = st.sidebar.selectbox("Select Your State:", state_list)
+    refresh = st.sidebar.checkbox("Regenerate (ignore cached report)")
+    stream = st.sidebar.checkbox("Stream progress", value=True)
     tigger = st.sidebar.button("Begin Analysis", use_container_width=True, icon = "📄")
     st.header(f"Selected State : {state}")
     if tigger:
         with st.spinner("Thinking..."):
-            response = requests.post(f"{API_URL}/generate_research", json={"state": state})
-            if response.status_code == 200:
-                answer = response.json()["answer"]
-                st.markdown(answer)
+            if stream:
+                stream_report(state, refresh)
             else:
-                st.error(f"Error: {response.text}")
+                poll_report(state, refresh)
         
 if __name__ == "__main__":
 # Set page configuration